@@ -209,26 +209,29 @@ uploaded_pdfs = st.sidebar.file_uploader(
 )
 
 if uploaded_pdfs:
-    for pdf_file in uploaded_pdfs:
-        if pdf_file.name not in st.session_state.pdf_library.get_library_files():
-            with st.spinner(f"Processing {pdf_file.name}..."):
-                success = st.session_state.pdf_library.add_pdf(pdf_file)
-                if success:
-                    # Check if PDF matches bibliography entry
-                    pdf_content = st.session_state.pdf_library.get_pdf_content(pdf_file.name)
-                    if pdf_content and hasattr(st.session_state, 'bibliography_parser') and len(st.session_state.bibliography_parser.get_all_entries()) > 0:
-                        matching_entry = st.session_state.bibliography_parser.find_matching_entry(
-                            pdf_file.name, 
-                            pdf_content.get('metadata', {})
-                        )
-                        if matching_entry:
-                            st.sidebar.success(f"✅ {pdf_file.name} (Validated against bibliography)")
-                        else:
-                            st.sidebar.warning(f"⚠️ {pdf_file.name} (Not found in bibliography)")
+    library_files = st.session_state.pdf_library.get_library_files()
+    new_pdfs = [pdf_file for pdf_file in uploaded_pdfs if pdf_file.name not in library_files]
+    if new_pdfs:
+        with st.spinner(f"Processing {len(new_pdfs)} PDF(s)..."):
+            added = st.session_state.pdf_library.add_pdfs(new_pdfs)
+        for pdf_file in new_pdfs:
+            success = added.get(pdf_file.name, False)
+            if success:
+                # Check if PDF matches bibliography entry
+                pdf_content = st.session_state.pdf_library.get_pdf_content(pdf_file.name)
+                if pdf_content and hasattr(st.session_state, 'bibliography_parser') and len(st.session_state.bibliography_parser.get_all_entries()) > 0:
+                    matching_entry = st.session_state.bibliography_parser.find_matching_entry(
+                        pdf_file.name, 
+                        pdf_content.get('metadata', {})
+                    )
+                    if matching_entry:
+                        st.sidebar.success(f"✅ {pdf_file.name} (Validated against bibliography)")
                     else:
-                        st.sidebar.success(f"Added: {pdf_file.name}")
+                        st.sidebar.warning(f"⚠️ {pdf_file.name} (Not found in bibliography)")
                 else:
-                    st.sidebar.error(f"Failed to process: {pdf_file.name}")
+                    st.sidebar.success(f"Added: {pdf_file.name}")
+            else:
+                st.sidebar.error(f"Failed to process: {pdf_file.name}")
 
 # Display current library with validation status
 library_files = st.session_state.pdf_library.get_library_files()
@@ -0,0 +1,15 @@
+from typing import Any, Dict, Hashable
+
+def cache_put(cache: Dict, key: Hashable, value: Any, max_size: int) -> None:
+    """
+    Store a value in a size-bounded cache, evicting the oldest entry when it is full.
+    
+    Args:
+        cache: Cache dictionary to store into (insertion order is eviction order)
+        key: Cache key, e.g. a content hash
+        value: Value to cache
+        max_size: Maximum number of entries kept
+    """
+    if key not in cache and len(cache) >= max_size:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
@@ -1,19 +1,198 @@
+import functools
 import json
 import os
 import re
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
 from openai import AzureOpenAI
+import httpx
 import nltk
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from rapidfuzz import fuzz, process as fuzz_process, utils as fuzz_utils
 import numpy as np
 from enum import Enum
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+# Locate NLTK sentence tokenizer data once; only download it when explicitly enabled
+NLTK_PUNKT_AVAILABLE = False
+for _punkt_package in ('punkt_tab', 'punkt'):
+    try:
+        nltk.data.find(f'tokenizers/{_punkt_package}')
+        NLTK_PUNKT_AVAILABLE = True
+        break
+    except LookupError:
+        continue
+else:
+    if os.getenv("FAYCITE_NLTK_DOWNLOAD", "").lower() in ('1', 'true', 'yes'):
+        NLTK_PUNKT_AVAILABLE = bool(nltk.download('punkt_tab', quiet=True))
+
+# Start of the claims array in the streamed claim-identification response
+_CLAIMS_ARRAY_RE = re.compile(r'"claims"\s*:\s*\[')
+
+# Fallback sentence splitter used when Punkt data is unavailable
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Character caps applied to library chunks when indexing and prompting
+INDEX_TEXT_LIMIT = 4000
+QUOTE_TEXT_LIMIT = 2000
+
+# Sentence similarity above which a source sentence is used as the quote without an LLM call
+LOCAL_QUOTE_MIN_SIMILARITY = 0.5
+
+# Longest source sentence used as a local quote (the quote prompt's 150-word limit)
+LOCAL_QUOTE_MAX_WORDS = 150
+
+# Share of the claim's content words a local quote must contain; TF-IDF alone ignores words outside
+# the library vocabulary, so without this a sentence matching only part of the claim would pass
+LOCAL_QUOTE_MIN_COVERAGE = 0.8
+
+# Words compared when checking how much of a claim a quote covers
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Token-sort similarity (0-100) at which claims of the same type reuse one citation lookup
+CLAIM_DUPLICATE_MIN_SCORE = 90
+
+# Numbers in a claim; near-duplicate claims must state the same ones
+_CLAIM_NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)*')
+
+# Negations in a claim; near-duplicate claims must negate alike, or they may mean the opposite
+_CLAIM_NEGATION_RE = re.compile(r"\b(?:not|no|never|none|nor|neither|cannot|without)\b|n't")
+
+# Metadata field -> bibliography entry field used when converting a bibliography entry
+_BIB_FIELD_MAP = {
+    'title': 'title',
+    'creation_date': 'year',
+    'subject': 'journal',  # Keep for backward compatibility
+    'journal': 'journal',
+    'volume': 'volume',
+    'issue': 'issue',
+    'pages': 'pages',
+    'publisher': 'publisher',
+    'doi': 'doi',
+    'url': 'url',
+    'isbn': 'isbn',
+    'issn': 'issn',
+    'editor': 'editor',
+    'edition': 'edition',
+    'place': 'place',
+    'conference': 'conference',
+    'book_title': 'book_title',  # For book chapters
+    'series': 'series'
+}
+
+# Fields every reference entry carries, empty when unknown
+ESSENTIAL_REFERENCE_FIELDS = ('title', 'authors', 'author', 'year', 'journal', 'volume', 'issue', 'pages', 'doi', 'url', 'publisher')
+
+# Fields a matching bibliography entry contributes to reference metadata
+BIBLIOGRAPHY_REFERENCE_FIELDS = ESSENTIAL_REFERENCE_FIELDS + ('editor', 'edition', 'type')
+
+# Token-sort similarity (0-100) a paper sentence needs to stand in for a claim not found verbatim;
+# unlike token-set, a short heading whose words all appear in the claim does not score 100
+SENTENCE_MATCH_MIN_SCORE = 70
+
+# Minimum authority score a source needs before it can support each claim type
+AUTHORITY_THRESHOLDS = {
+    'FACTUAL': 0.6,  # High threshold for factual claims
+    'STATISTICAL': 0.65,  # Very high threshold for data claims
+    'THEORETICAL': 0.55,  # Moderate threshold for theory
+    'METHODOLOGICAL': 0.7,  # Highest threshold for methods
+    'OPINION_INTERPRETATION': 0.4  # Lower threshold for opinions
+}
+
+# Claim-type specific authority scoring, evaluated over whole feature columns at once
+def _score_base_authority(c: Dict[str, np.ndarray]) -> np.ndarray:
+    return np.full(c['journal'].shape, 0.5)
+
+AUTHORITY_SCORERS = {
+    # Prefer authoritative, primary sources: journal, DOI, university press
+    'FACTUAL': lambda c: 0.5 + 0.2 * c['journal'] + 0.1 * c['doi'] + 0.1 * c['university_press'],
+    # Prefer data sources with methodology, recent data preferred
+    'STATISTICAL': lambda c: 0.5 + 0.3 * c['journal'] + 0.2 * c['kw_authority_statistical'] + 0.1 * (c['year'] >= 2015),
+    # Prefer foundational academic sources, older foundational work and recent theory valued
+    'THEORETICAL': lambda c: 0.5 + 0.2 * c['journal'] + 0.1 * (c['year'] <= 2000) + 0.05 * (c['year'] >= 2010) + 0.15 * c['kw_authority_theoretical'],
+    # Strong preference for peer-reviewed research methods
+    'METHODOLOGICAL': lambda c: 0.5 + 0.3 * c['journal'] + 0.2 * c['kw_authority_methodological'] + 0.1 * c['doi'],
+    # Value balanced perspectives and recent analysis
+    'OPINION_INTERPRETATION': lambda c: 0.5 + 0.15 * (c['year'] >= 2018) + 0.1 * c['journal'] + 0.1 * c['kw_authority_opinion'],
+}
+
+# Filename keyword groups consulted by authority scoring and claim-type matching
+FILENAME_KEYWORDS = {
+    'authority_statistical': ('data', 'study', 'survey', 'analysis'),
+    'authority_theoretical': ('theory', 'framework', 'model', 'concept'),
+    'authority_methodological': ('method', 'procedure', 'protocol', 'technique'),
+    'authority_opinion': ('analysis', 'perspective', 'discussion', 'review'),
+    'factual_strong': ('report', 'study', 'research', 'data'),
+    'statistical_strong': ('data', 'statistics', 'survey', 'analysis'),
+    'statistical_good': ('study', 'research'),
+    'theoretical_strong': ('theory', 'framework', 'model'),
+    'theoretical_good': ('concept', 'principle'),
+    'methodological_strong': ('method', 'protocol', 'procedure'),
+    'methodological_good': ('technique', 'approach'),
+    'opinion_strong': ('analysis', 'perspective', 'review'),
+    'opinion_good': ('discussion', 'commentary'),
+}
+
+# Every keyword in one alternation; the lookahead reports overlapping hits in a single pass
+_FILENAME_KEYWORD_RE = re.compile(
+    '(?=(' + '|'.join(sorted({re.escape(kw) for kws in FILENAME_KEYWORDS.values() for kw in kws}, key=len, reverse=True)) + '))'
+)
+
+@functools.lru_cache(maxsize=1)
+def _punkt_tokenizer():
+    """Load the English Punkt sentence tokenizer once, or None if its data is unavailable."""
+    if not NLTK_PUNKT_AVAILABLE:
+        return None
+    try:
+        return nltk.tokenize.PunktTokenizer('english')
+    except LookupError:
+        return None
+
+def _sent_tokenize(text: str) -> List[str]:
+    """Split text into sentences, using NLTK Punkt when its data is installed."""
+    tokenizer = _punkt_tokenizer()
+    if tokenizer is not None:
+        return tokenizer.tokenize(text)
+    return _SENTENCE_SPLIT_RE.split(text)
+
+def _iter_streamed_claims(text_chunks: Iterable[str]) -> Iterator[Any]:
+    """Yield items of a streamed JSON "claims" array as soon as each item is complete."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = -1  # Where the next array item may start, once the array is found
+    finished = False
+    
+    for text_chunk in text_chunks:
+        if finished:
+            continue  # Drain the stream
+        buffer += text_chunk
+        
+        if position < 0:
+            match = _CLAIMS_ARRAY_RE.search(buffer)
+            if not match:
+                continue
+            position = match.end()
+        
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position >= len(buffer):
+                break
+            if buffer[position] == ']':
+                finished = True
+                break
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # Item not complete yet; wait for more text
+            yield item
+
+def _truncate_and_normalize(text: str) -> str:
+    """Cap a library chunk for indexing and collapse its whitespace."""
+    return ' '.join(text[:INDEX_TEXT_LIMIT].split())
+
+@functools.lru_cache(maxsize=1024)
+def _filename_keyword_groups(filename: str) -> frozenset:
+    """Return the FILENAME_KEYWORDS groups with at least one keyword in the filename."""
+    found = {match.group(1) for match in _FILENAME_KEYWORD_RE.finditer(filename.lower())}
+    return frozenset(group for group, keywords in FILENAME_KEYWORDS.items() if not found.isdisjoint(keywords))
 
 class ClaimType(Enum):
     """Enumeration of academic claim types for targeted citation strategies."""
@@ -26,6 +205,20 @@ class ClaimType(Enum):
 class CitationProcessor:
     def __init__(self):
         """Initialize the citation processor with Azure OpenAI client."""
+        # TF-IDF index over the PDF library, rebuilt only when the library changes
+        self._library_signature = None
+        self._library_texts = []
+        self._library_quote_texts = []
+        self._library_vectorizer = None
+        self._library_matrix = None
+        self._kw_match = {}
+        self._authority_feature_columns = None
+        self._authority_scores = {}
+        self._eligible = {}
+        self._sentence_index = {}
+        self._quote_stats = {'local': 0, 'llm': 0}
+        self._http_client = None
+        
         self.azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "")
         self.azure_api_key = os.getenv("AZURE_OPENAI_API_KEY", "")
         self.azure_deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "")
@@ -46,13 +239,30 @@ class CitationProcessor:
             self.model = None
             return
         
-        # Initialize Azure OpenAI client
+        # Initialize Azure OpenAI client on a pooled connection that is kept alive across papers
+        self._http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
         self.client = AzureOpenAI(
             azure_endpoint=self.azure_endpoint,
             api_key=self.azure_api_key,
-            api_version="2024-02-01"
+            api_version="2024-02-01",
+            http_client=self._http_client
         )
         self.model = self.azure_deployment
+    
+    def close(self):
+        """Close the pooled HTTP connections used by the OpenAI client."""
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
         
     def process_paper(self, paper_content: str, pdf_library, bibliography_parser=None, citation_formatter=None) -> Optional[Dict[str, Any]]:
         """
@@ -84,46 +294,48 @@ class CitationProcessor:
         
         try:
             # CRITICAL FIX: Store references for citation generation BEFORE any authority scoring
-            # This ensures _calculate_source_authority has access to PDF metadata
+            # This ensures authority scoring has access to PDF metadata
             self.pdf_library = pdf_library
             self.bibliography_parser = bibliography_parser
             
+            # Authority depends on metadata and bibliography, so rescore sources on every run
+            self._authority_feature_columns = None
+            self._authority_scores = {}
+            self._eligible = {}
+            self._quote_stats = {'local': 0, 'llm': 0}
+            
             # Reset citation formatter state for new analysis (critical for IEEE numbering)
             if citation_formatter:
                 citation_formatter.reset_state()
             
-            # Step 1: Identify and categorize claims requiring citations
+            # Step 1: Identify and categorize claims requiring citations (streamed as the model produces them)
             claims = self._identify_claims(paper_content)
             
-            if not claims:
-                return {
-                    'original_text': paper_content,
-                    'cited_text': paper_content,
-                    'citations': [],
-                    'references': '',
-                    'stats': {
-                        'claims_identified': 0,
-                        'citations_added': 0,
-                        'sources_used': 0
-                    }
-                }
-            
-            # Step 2: Find supporting content for each categorized claim
+            # Step 2: Find supporting content for each claim while later claims are still being generated
             citations_found = []
-            cited_text = paper_content
+            cited_claims = []
+            claims_identified = 0
             
-            for claim_obj in claims:
+            # Repeated or near-identical claims share one search and quote extraction
+            seen_claims = {'keys': {}, 'texts': {}, 'groups': {}}
+            resolved_groups = {}
+            
+            for claim_idx, claim_obj in enumerate(claims):
+                claims_identified += 1
                 claim_text = claim_obj.get('text', '') if isinstance(claim_obj, dict) else str(claim_obj)
                 claim_type = claim_obj.get('type', 'FACTUAL') if isinstance(claim_obj, dict) else 'FACTUAL'
                 claim_reasoning = claim_obj.get('reasoning', '') if isinstance(claim_obj, dict) else ''
                 
-                supporting_content = self._find_supporting_content(
-                    claim_text, 
-                    pdf_library, 
-                    bibliography_parser, 
-                    citation_formatter,
-                    claim_type=claim_type
-                )
+                group = self._assign_claim_group(claim_idx, claim_text, claim_type, seen_claims)
+                if group not in resolved_groups:
+                    resolved_groups[group] = self._find_supporting_content(
+                        claim_text, 
+                        pdf_library, 
+                        bibliography_parser, 
+                        citation_formatter,
+                        claim_type=claim_type
+                    )
+                supporting_content = resolved_groups[group]
                 if supporting_content:
                     citations_found.append({
                         'claim': claim_text,
@@ -135,14 +347,23 @@ class CitationProcessor:
                         'citation': supporting_content['citation'],
                         'source_authority_score': supporting_content.get('authority_score', 0.5)
                     })
-                    
-                    # Insert citation into text
-                    cited_text = self._insert_citation(
-                        cited_text, 
-                        claim_text, 
-                        supporting_content,
-                        citation_formatter
-                    )
+                    cited_claims.append((claim_text, supporting_content))
+            
+            if not claims_identified:
+                return {
+                    'original_text': paper_content,
+                    'cited_text': paper_content,
+                    'citations': [],
+                    'references': '',
+                    'stats': {
+                        'claims_identified': 0,
+                        'citations_added': 0,
+                        'sources_used': 0
+                    }
+                }
+            
+            # Insert all citations into the text in one pass
+            cited_text = self._insert_citations(paper_content, cited_claims, citation_formatter)
             
             # Step 3: Generate references list
             references = self._generate_references_list(citations_found, citation_formatter)
@@ -156,9 +377,11 @@ class CitationProcessor:
                 'citations': citations_found,
                 'references': references,
                 'stats': {
-                    'claims_identified': len(claims),
+                    'claims_identified': claims_identified,
                     'citations_added': len(citations_found),
-                    'sources_used': unique_sources
+                    'sources_used': unique_sources,
+                    'local_quote_hits': self._quote_stats['local'],
+                    'llm_quote_calls': self._quote_stats['llm']
                 }
             }
             
@@ -166,15 +389,68 @@ class CitationProcessor:
             print(f"Error processing paper: {str(e)}")
             return None
     
-    def _identify_claims(self, text: str) -> List[Dict[str, str]]:
+    def _assign_claim_group(self, claim_idx: int, claim_text: str, claim_type: str, seen_claims: Dict[str, Dict]) -> int:
+        """
+        Assign a claim to the group of an earlier identical or near-identical claim of the same type.
+        
+        Args:
+            claim_idx: Position of the claim in document order
+            claim_text: The claim text
+            claim_type: Type of the claim
+            seen_claims: Grouping state shared by the claims of one paper
+            
+        Returns:
+            Group id (the position of the group's first claim)
+        """
+        # Exact duplicates after lowercasing and collapsing whitespace
+        normalized = ' '.join(claim_text.lower().split())
+        key = (claim_type, normalized)
+        if key in seen_claims['keys']:
+            return seen_claims['keys'][key]
+        
+        group = claim_idx
+        
+        # Near duplicates by token similarity between the claims themselves, so every word counts;
+        # claims citing different figures or negated differently are never merged
+        try:
+            bucket = (
+                claim_type,
+                tuple(_CLAIM_NUMBER_RE.findall(normalized)),
+                tuple(_CLAIM_NEGATION_RE.findall(normalized))
+            )
+            earlier_texts = seen_claims['texts'].setdefault(bucket, [])
+            earlier_groups = seen_claims['groups'].setdefault(bucket, [])
+            
+            match = fuzz_process.extractOne(
+                normalized,
+                earlier_texts,
+                scorer=fuzz.token_sort_ratio,
+                processor=fuzz_utils.default_process,
+                score_cutoff=CLAIM_DUPLICATE_MIN_SCORE
+            )
+            if match is not None:
+                group = earlier_groups[match[2]]
+            
+            earlier_texts.append(normalized)
+            earlier_groups.append(group)
+        except Exception as e:
+            print(f"Error grouping duplicate claims: {str(e)}")
+        
+        seen_claims['keys'][key] = group
+        return group
+    
+    def _identify_claims(self, text: str) -> Iterator[Dict[str, str]]:
         """
         Identify and categorize claims in the text that require citations using OpenAI.
         
+        The response is streamed and each claim is yielded as soon as its JSON object
+        is complete, so callers can start searching before the model has finished.
+        
         Args:
             text: The paper content
             
-        Returns:
-            List of dictionaries containing claims and their categories
+        Yields:
+            Dictionaries containing claims and their categories
         """
         try:
             prompt = f"""
@@ -223,18 +499,31 @@ class CitationProcessor:
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                stream=True
             )
             
-            content = response.choices[0].message.content
-            if content is None:
-                return []
-            result = json.loads(content)
-            return result.get('claims', [])
+            received = []
+            claims_yielded = 0
+            
+            def response_text():
+                for chunk in response:
+                    # Azure sends content-filter chunks without choices
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        received.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            
+            for claim in _iter_streamed_claims(response_text()):
+                claims_yielded += 1
+                yield claim
+            
+            # Fall back to parsing the whole response if no claims array was streamed
+            if not claims_yielded and received:
+                result = json.loads(''.join(received))
+                yield from result.get('claims', [])
             
         except Exception as e:
             print(f"Error identifying claims: {str(e)}")
-            return []
     
     def _find_supporting_content(self, claim: str, pdf_library, bibliography_parser=None, citation_formatter=None, claim_type: str = 'FACTUAL') -> Optional[Dict[str, str]]:
         """
@@ -257,28 +546,43 @@ class CitationProcessor:
             if not library_content:
                 return None
             
-            # Use semantic search to find most relevant content
-            best_match = self._semantic_search(claim, library_content)
-            
-            if not best_match:
+            if not self._ensure_library_index(library_content):
                 return None
             
-            # Calculate authority score based on claim type and source characteristics
-            authority_score = self._calculate_source_authority(best_match, claim_type, bibliography_parser)
+            # Authority scores and eligibility depend only on the source, not the claim
+            authority_scores = self._source_authority_scores(library_content, claim_type, bibliography_parser)
             
-            # Apply claim-type specific filtering
-            if not self._is_source_appropriate_for_claim_type(best_match, claim_type, authority_score):
+            # Most relevant content among sources that meet the claim type's authority bar
+            best_idx = self._semantic_search(claim, library_content, self._eligible[claim_type])
+            
+            if best_idx is not None:
+                authority_score = float(authority_scores[best_idx])
+            else:
+                # No eligible source is relevant enough; fall back to the overall best match
+                best_idx = self._semantic_search(claim, library_content)
+                
+                if best_idx is None:
+                    return None
+                
                 # Try to find a better match with higher authority
                 alternative_matches = self._get_alternative_matches(claim, library_content, claim_type, bibliography_parser)
                 if alternative_matches:
-                    best_match = alternative_matches[0]
-                    authority_score = self._calculate_source_authority(best_match, claim_type, bibliography_parser)
+                    best_idx, authority_score = alternative_matches[0]
                 else:
                     # Use original match but note low authority
-                    pass
+                    authority_score = float(authority_scores[best_idx])
+            
+            best_match = library_content[best_idx]
+            
+            # Take the quote straight from the source when one sentence clearly matches the claim
+            quote_info = self._local_supporting_quote(claim, best_match)
             
-            # Extract a relevant quote using OpenAI
-            quote_info = self._extract_supporting_quote(claim, best_match)
+            if quote_info:
+                self._quote_stats['local'] += 1
+            else:
+                # Extract a relevant quote using OpenAI
+                quote_info = self._extract_supporting_quote(claim, best_match, self._library_quote_texts[best_idx])
+                self._quote_stats['llm'] += 1
             
             if quote_info:
                 # Generate citation for this source using selected style
@@ -299,141 +603,110 @@ class CitationProcessor:
             print(f"Error finding supporting content: {str(e)}")
             return None
     
-    def _calculate_source_authority(self, source: Dict, claim_type: str, bibliography_parser=None) -> float:
+    def _source_metadata(self, filename: str, bibliography_parser=None) -> Dict:
         """
-        Calculate authority score for a source based on claim type and source characteristics.
+        Get PDF metadata for a source, enhanced with its bibliography entry if one matches.
         
         Args:
-            source: Source content dictionary
-            claim_type: Type of claim needing support
+            filename: PDF filename
             bibliography_parser: BibliographyParser for enhanced metadata
             
         Returns:
-            Authority score from 0.0 to 1.0
+            Metadata dictionary
         """
-        try:
-            score = 0.5  # Base score
-            filename = source.get('filename', '')
-            
-            # Get enhanced metadata if available
-            metadata = {}
-            if hasattr(self, 'pdf_library'):
-                pdf_content = self.pdf_library.get_pdf_content(filename)
-                if pdf_content:
-                    metadata = pdf_content.get('metadata', {})
-            
-            # Enhance with bibliography data
-            bib_entry = None
-            if bibliography_parser:
-                bib_entry = bibliography_parser.find_matching_entry(filename, metadata)
-                if bib_entry:
-                    metadata.update(self._convert_bibliography_to_metadata(bib_entry))
+        # Get enhanced metadata if available
+        metadata = {}
+        if hasattr(self, 'pdf_library'):
+            pdf_content = self.pdf_library.get_pdf_content(filename)
+            if pdf_content:
+                # Copied so bibliography data never overwrites the library's own metadata
+                metadata = dict(pdf_content.get('metadata', {}))
+        
+        # Enhance with bibliography data
+        if bibliography_parser:
+            bib_entry = bibliography_parser.find_matching_entry(filename, metadata)
+            if bib_entry:
+                metadata.update(self._convert_bibliography_to_metadata(bib_entry))
+        
+        return metadata
+    
+    def _authority_columns(self, library_content: List[Dict], bibliography_parser=None) -> Dict[str, np.ndarray]:
+        """
+        Gather the per-chunk source features that authority scoring reads, one array per feature.
+        
+        Args:
+            library_content: All available library content
+            bibliography_parser: BibliographyParser for enhanced metadata
             
-            # Authority factors based on claim type
-            if claim_type == 'FACTUAL':
-                # Prefer authoritative, primary sources
-                if metadata.get('journal'):
-                    score += 0.2  # Published in journal
-                if metadata.get('doi'):
-                    score += 0.1  # Has DOI
-                if metadata.get('publisher') and 'university' in metadata.get('publisher', '').lower():
-                    score += 0.1  # University press
-                    
-            elif claim_type == 'STATISTICAL':
-                # Prefer data sources with methodology
-                if metadata.get('journal'):
-                    score += 0.3  # Journal article likely has methodology
-                if any(term in filename.lower() for term in ['data', 'study', 'survey', 'analysis']):
-                    score += 0.2  # Likely contains data
-                if metadata.get('year'):
-                    try:
-                        year = int(metadata['year'])
-                        if year >= 2015:  # Recent data preferred
-                            score += 0.1
-                    except (ValueError, TypeError):
-                        pass
-                        
-            elif claim_type == 'THEORETICAL':
-                # Prefer foundational academic sources
-                if metadata.get('journal'):
-                    score += 0.2
-                if metadata.get('year'):
-                    try:
-                        year = int(metadata['year'])
-                        if year <= 2000:  # Older foundational work valued
-                            score += 0.1
-                        elif year >= 2010:  # Also value recent theory
-                            score += 0.05
-                    except (ValueError, TypeError):
-                        pass
-                if any(term in filename.lower() for term in ['theory', 'framework', 'model', 'concept']):
-                    score += 0.15
-                    
-            elif claim_type == 'METHODOLOGICAL':
-                # Prefer peer-reviewed research methods
-                if metadata.get('journal'):
-                    score += 0.3  # Strong preference for peer-reviewed
-                if any(term in filename.lower() for term in ['method', 'procedure', 'protocol', 'technique']):
-                    score += 0.2
-                if metadata.get('doi'):
-                    score += 0.1
-                    
-            elif claim_type == 'OPINION_INTERPRETATION':
-                # Value balanced perspectives and recent analysis
-                if metadata.get('year'):
-                    try:
-                        year = int(metadata['year'])
-                        if year >= 2018:  # Recent perspectives valued
-                            score += 0.15
-                    except (ValueError, TypeError):
-                        pass
-                if metadata.get('journal'):
-                    score += 0.1  # Academic discussion
-                if any(term in filename.lower() for term in ['analysis', 'perspective', 'discussion', 'review']):
-                    score += 0.1
-            
-            # General quality indicators
-            if metadata.get('author'):
-                score += 0.05  # Has identified author
-            if metadata.get('title'):
-                score += 0.05  # Has proper title
+        Returns:
+            Dictionary of feature name to array aligned with library_content
+        """
+        if self._authority_feature_columns is None:
+            # Metadata only depends on the file, so read each file once
+            file_positions = {}
+            file_rows = []
+            for content in library_content:
+                filename = content['filename']
+                if filename in file_positions:
+                    continue
+                file_positions[filename] = len(file_rows)
                 
-            return min(score, 1.0)  # Cap at 1.0
-            
-        except Exception as e:
-            print(f"Error calculating source authority: {str(e)}")
-            return 0.5
+                try:
+                    metadata = self._source_metadata(filename, bibliography_parser)
+                except Exception as e:
+                    print(f"Error reading source metadata for {filename}: {str(e)}")
+                    metadata = {}
+                
+                try:
+                    year = int(metadata['year']) if metadata.get('year') else np.nan
+                except (ValueError, TypeError):
+                    year = np.nan
+                
+                file_rows.append((
+                    bool(metadata.get('journal')),
+                    bool(metadata.get('doi')),
+                    bool(metadata.get('publisher')) and 'university' in metadata.get('publisher', '').lower(),
+                    year,
+                    bool(metadata.get('author')),
+                    bool(metadata.get('title'))
+                ))
+            
+            # Expand file-level features to chunks
+            file_index = np.array([file_positions[content['filename']] for content in library_content], dtype=np.intp)
+            features = np.array(file_rows, dtype=np.float64).reshape(-1, 6)[file_index]
+            
+            columns = dict(zip(('journal', 'doi', 'university_press', 'year', 'author', 'title'), features.T))
+            columns.update({f'kw_{group}': matches for group, matches in self._kw_match.items()})
+            self._authority_feature_columns = columns
+        
+        return self._authority_feature_columns
     
-    def _is_source_appropriate_for_claim_type(self, source: Dict, claim_type: str, authority_score: float) -> bool:
+    def _source_authority_scores(self, library_content: List[Dict], claim_type: str, bibliography_parser=None) -> np.ndarray:
         """
-        Check if source meets minimum requirements for claim type.
+        Score every indexed source for a claim type and record which ones are eligible.
         
         Args:
-            source: Source content dictionary
-            claim_type: Type of claim
-            authority_score: Calculated authority score
+            library_content: All available library content
+            claim_type: Type of claim needing support
+            bibliography_parser: BibliographyParser for enhanced metadata
             
         Returns:
-            True if source is appropriate for claim type
+            Authority score from 0.0 to 1.0 for each library chunk
         """
-        try:
-            # Minimum thresholds by claim type
-            thresholds = {
-                'FACTUAL': 0.6,  # High threshold for factual claims
-                'STATISTICAL': 0.65,  # Very high threshold for data claims
-                'THEORETICAL': 0.55,  # Moderate threshold for theory
-                'METHODOLOGICAL': 0.7,  # Highest threshold for methods
-                'OPINION_INTERPRETATION': 0.4  # Lower threshold for opinions
-            }
+        if claim_type not in self._authority_scores:
+            columns = self._authority_columns(library_content, bibliography_parser)
+            scorer = AUTHORITY_SCORERS.get(claim_type, _score_base_authority)
             
-            threshold = thresholds.get(claim_type, 0.5)
-            return authority_score >= threshold
+            # General quality indicators: identified author and proper title
+            scores = scorer(columns) + 0.05 * columns['author'] + 0.05 * columns['title']
+            scores = np.minimum(scores, 1.0)  # Cap at 1.0
             
-        except Exception as e:
-            print(f"Error checking source appropriateness: {str(e)}")
-            return True  # Default to allowing source
+            self._authority_scores[claim_type] = scores
+            self._eligible[claim_type] = scores >= AUTHORITY_THRESHOLDS.get(claim_type, 0.5)
+        
+        return self._authority_scores[claim_type]
     
-    def _get_alternative_matches(self, claim: str, library_content: List[Dict], claim_type: str, bibliography_parser=None) -> List[Dict]:
+    def _get_alternative_matches(self, claim: str, library_content: List[Dict], claim_type: str, bibliography_parser=None) -> List[Tuple[int, float]]:
         """
         Find alternative source matches ranked by authority for the claim type.
         
@@ -444,41 +717,34 @@ class CitationProcessor:
             bibliography_parser: BibliographyParser instance
             
         Returns:
-            List of alternative sources ranked by authority
+            List of (index into library_content, authority score) ranked by authority
         """
         try:
-            # Get multiple matches using semantic search
-            texts = [claim] + [content['text'] for content in library_content]
-            
-            vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
-            tfidf_matrix = vectorizer.fit_transform(texts)
-            
-            claim_vector = tfidf_matrix[0]
-            content_vectors = tfidf_matrix[1:]
+            # Get multiple matches using the shared library index
+            if not self._ensure_library_index(library_content):
+                return []
             
-            similarities = cosine_similarity(claim_vector, content_vectors).flatten()
+            similarities = self._claim_similarities(claim)
             
             # Get top matches above threshold
             threshold = 0.05  # Lower threshold for alternatives
-            candidate_indices = [i for i, sim in enumerate(similarities) if sim > threshold]
-            
-            # Calculate authority scores for candidates
-            candidates_with_scores = []
-            for idx in candidate_indices:
-                source = library_content[idx]
-                authority_score = self._calculate_source_authority(source, claim_type, bibliography_parser)
-                candidates_with_scores.append({
-                    'source': source,
-                    'similarity': similarities[idx],
-                    'authority': authority_score,
-                    'combined_score': similarities[idx] * 0.4 + authority_score * 0.6  # Weight authority higher
-                })
-            
-            # Sort by combined score (authority-weighted)
-            candidates_with_scores.sort(key=lambda x: x['combined_score'], reverse=True)
-            
-            # Return top alternative sources
-            return [c['source'] for c in candidates_with_scores[:3]]
+            candidate_indices = np.flatnonzero(similarities > threshold)
+            
+            if candidate_indices.size == 0:
+                return []
+            
+            # Combine similarity with cached authority scores (weight authority higher)
+            authority_scores = self._source_authority_scores(library_content, claim_type, bibliography_parser)
+            combined_scores = similarities[candidate_indices] * 0.4 + authority_scores[candidate_indices] * 0.6
+            
+            # Partial selection of the top candidates, then order just those (ties keep library order)
+            top_k = min(3, combined_scores.size)
+            cutoff = np.partition(combined_scores, -top_k)[-top_k]
+            top = np.flatnonzero(combined_scores >= cutoff)
+            top = top[np.argsort(-combined_scores[top], kind='stable')[:top_k]]
+            
+            # Return top alternative sources with the authority they were ranked by
+            return [(int(candidate_indices[i]), float(authority_scores[candidate_indices[i]])) for i in top]
             
         except Exception as e:
             print(f"Error finding alternative matches: {str(e)}")
@@ -496,39 +762,39 @@ class CitationProcessor:
             Match evaluation string
         """
         try:
-            filename = source.get('filename', '').lower()
+            keyword_groups = _filename_keyword_groups(source.get('filename', ''))
             
             # Type-specific matching logic
             if claim_type == 'FACTUAL':
-                if any(term in filename for term in ['report', 'study', 'research', 'data']):
+                if 'factual_strong' in keyword_groups:
                     return "Strong match - authoritative source"
                 return "Moderate match - general source"
                 
             elif claim_type == 'STATISTICAL':
-                if any(term in filename for term in ['data', 'statistics', 'survey', 'analysis']):
+                if 'statistical_strong' in keyword_groups:
                     return "Strong match - data source"
-                elif any(term in filename for term in ['study', 'research']):
+                elif 'statistical_good' in keyword_groups:
                     return "Good match - research source"
                 return "Weak match - limited data evidence"
                 
             elif claim_type == 'THEORETICAL':
-                if any(term in filename for term in ['theory', 'framework', 'model']):
+                if 'theoretical_strong' in keyword_groups:
                     return "Strong match - theoretical source"
-                elif any(term in filename for term in ['concept', 'principle']):
+                elif 'theoretical_good' in keyword_groups:
                     return "Good match - conceptual source"
                 return "Moderate match - general academic source"
                 
             elif claim_type == 'METHODOLOGICAL':
-                if any(term in filename for term in ['method', 'protocol', 'procedure']):
+                if 'methodological_strong' in keyword_groups:
                     return "Strong match - methodological source"
-                elif any(term in filename for term in ['technique', 'approach']):
+                elif 'methodological_good' in keyword_groups:
                     return "Good match - procedural source"
                 return "Weak match - limited methodological detail"
                 
             elif claim_type == 'OPINION_INTERPRETATION':
-                if any(term in filename for term in ['analysis', 'perspective', 'review']):
+                if 'opinion_strong' in keyword_groups:
                     return "Strong match - analytical source"
-                elif any(term in filename for term in ['discussion', 'commentary']):
+                elif 'opinion_good' in keyword_groups:
                     return "Good match - interpretive source"
                 return "Moderate match - general source"
                 
@@ -538,40 +804,98 @@ class CitationProcessor:
             print(f"Error evaluating claim type match: {str(e)}")
             return "Match evaluation unavailable"
     
-    def _semantic_search(self, claim: str, library_content: List[Dict]) -> Optional[Dict]:
+    def _ensure_library_index(self, library_content: List[Dict]) -> bool:
+        """
+        Build the TF-IDF index over the library content, reusing it while the library is unchanged.
+        
+        Args:
+            library_content: List of content from PDF library
+            
+        Returns:
+            True if an index is available for the given content
+        """
+        signature = tuple((content['filename'], content['page'], len(content['text'])) for content in library_content)
+        if signature == self._library_signature:
+            return True
+        
+        try:
+            # Cap each chunk once; the vectorizer and quote prompts share these views
+            texts = [_truncate_and_normalize(content['text']) for content in library_content]
+            
+            # Imported here so sklearn is only loaded once there is a library to index
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            
+            # L2-normalized float32 rows let cosine similarity reduce to a cheap dot product
+            vectorizer = TfidfVectorizer(stop_words='english', max_features=1000, sublinear_tf=True, norm='l2', dtype=np.float32)
+            matrix = vectorizer.fit_transform(texts).tocsr()
+            
+            # Sorted indices keep the sparse matmul on scipy's fast path
+            if not matrix.has_sorted_indices:
+                matrix.sort_indices()
+        
+        except Exception as e:
+            print(f"Error building library index: {str(e)}")
+            self._library_signature = None
+            return False
+        
+        self._library_texts = texts
+        self._library_quote_texts = [text[:QUOTE_TEXT_LIMIT] for text in texts]
+        self._library_vectorizer = vectorizer
+        self._library_matrix = matrix
+        self._authority_feature_columns = None
+        self._authority_scores = {}
+        self._eligible = {}
+        self._sentence_index = {}
+        
+        # Filename keyword hits per chunk, one boolean column per keyword group
+        keyword_groups = [_filename_keyword_groups(content['filename']) for content in library_content]
+        self._kw_match = {
+            group: np.array([group in groups for groups in keyword_groups], dtype=bool)
+            for group in FILENAME_KEYWORDS
+        }
+        self._library_signature = signature
+        return True
+    
+    def _claim_similarities(self, claim: str) -> np.ndarray:
+        """
+        Score a claim against every indexed library chunk.
+        
+        Args:
+            claim: The claim to score
+            
+        Returns:
+            Cosine similarity for each library chunk
+        """
+        claim_vector = self._library_vectorizer.transform([claim])
+        return (claim_vector @ self._library_matrix.T).toarray().ravel()
+    
+    def _semantic_search(self, claim: str, library_content: List[Dict], eligible: Optional[np.ndarray] = None) -> Optional[int]:
         """
         Perform semantic search to find the most relevant content.
         
         Args:
             claim: The claim to search for
             library_content: List of content from PDF library
+            eligible: Boolean mask restricting the search to some sources (optional)
             
         Returns:
-            Best matching content or None
+            Index of the best matching content or None
         """
         try:
-            if not library_content:
+            if not library_content or not self._ensure_library_index(library_content):
                 return None
             
-            # Prepare texts for vectorization
-            texts = [claim] + [content['text'] for content in library_content]
-            
-            # Create TF-IDF vectors
-            vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
-            tfidf_matrix = vectorizer.fit_transform(texts)
-            
             # Calculate similarity scores
-            claim_vector = tfidf_matrix[0]
-            content_vectors = tfidf_matrix[1:]
-            
-            similarities = cosine_similarity(claim_vector, content_vectors).flatten()
+            similarities = self._claim_similarities(claim)
+            if eligible is not None:
+                similarities = np.where(eligible, similarities, -1.0)
             
             # Find best match above threshold
             threshold = 0.1  # Minimum similarity threshold
-            best_idx = np.argmax(similarities)
+            best_idx = int(np.argmax(similarities))
             
             if similarities[best_idx] > threshold:
-                return library_content[best_idx]
+                return best_idx
             
             return None
             
@@ -579,24 +903,110 @@ class CitationProcessor:
             print(f"Error in semantic search: {str(e)}")
             return None
     
-    def _extract_supporting_quote(self, claim: str, content: Dict) -> Optional[Dict[str, str]]:
+    def _local_supporting_quote(self, claim: str, content: Dict) -> Optional[Dict[str, str]]:
+        """
+        Pick the source sentence most similar to the claim, skipping the LLM when it is close enough.
+        
+        Args:
+            claim: The claim needing support
+            content: Content dictionary with filename and page info
+            
+        Returns:
+            Dictionary with quote and page info, or None if no sentence is similar enough
+            and covers most of the claim (the LLM then judges relevance)
+        """
+        try:
+            sentences, sentence_matrix = self._page_sentences(content['filename'], content.get('page'))
+            if not sentences:
+                return None
+            
+            claim_vector = self._library_vectorizer.transform([claim])
+            sentence_similarities = (claim_vector @ sentence_matrix.T).toarray().ravel()
+            best_idx = int(np.argmax(sentence_similarities))
+            
+            if (sentence_similarities[best_idx] > LOCAL_QUOTE_MIN_SIMILARITY
+                    and self._claim_coverage(claim, sentences[best_idx]) >= LOCAL_QUOTE_MIN_COVERAGE):
+                return {
+                    'quote': sentences[best_idx],
+                    'page': str(content.get('page', 'N/A'))
+                }
+            
+            return None
+        
+        except Exception as e:
+            print(f"Error extracting local quote: {str(e)}")
+            return None
+    
+    def _claim_coverage(self, claim: str, sentence: str) -> float:
+        """
+        Share of the claim's content words (all of them, not just library vocabulary) found in a sentence.
+        
+        Args:
+            claim: The claim needing support
+            sentence: Candidate quote
+            
+        Returns:
+            Coverage from 0.0 to 1.0 (1.0 if the claim has no content words)
+        """
+        stop_words = self._library_vectorizer.get_stop_words() or frozenset()
+        claim_words = set(_WORD_RE.findall(claim.lower())) - stop_words
+        if not claim_words:
+            return 1.0
+        return len(claim_words & set(_WORD_RE.findall(sentence.lower()))) / len(claim_words)
+    
+    def _page_sentences(self, filename: str, page) -> Tuple[List[str], Any]:
+        """
+        Split a source page into quotable sentences and vectorize them, once per page.
+        
+        Library chunks have their sentence punctuation removed, so sentences come from
+        the page text the chunk was cut from.
+        
+        Args:
+            filename: PDF filename
+            page: Page number of the chunk
+            
+        Returns:
+            Tuple of (sentences of at most LOCAL_QUOTE_MAX_WORDS words, their TF-IDF rows or None)
+        """
+        key = (filename, page)
+        if key not in self._sentence_index:
+            sentences = []
+            pdf_content = self.pdf_library.get_pdf_content(filename) if hasattr(self, 'pdf_library') else None
+            for page_data in (pdf_content or {}).get('pages', []):
+                if page_data['page'] == page:
+                    for sentence in _sent_tokenize(page_data['text']):
+                        words = sentence.split()
+                        if words and len(words) <= LOCAL_QUOTE_MAX_WORDS:
+                            sentences.append(' '.join(words))
+                    break
+            
+            sentence_matrix = self._library_vectorizer.transform(sentences) if sentences else None
+            self._sentence_index[key] = (sentences, sentence_matrix)
+        
+        return self._sentence_index[key]
+    
+    def _extract_supporting_quote(self, claim: str, content: Dict, source_text: Optional[str] = None) -> Optional[Dict[str, str]]:
         """
         Extract a supporting quote from content using OpenAI.
         
         Args:
             claim: The claim needing support
             content: Content dictionary with text and page info
+            source_text: Pre-truncated source text for the prompt (optional)
             
         Returns:
             Dictionary with quote and page info
         """
         try:
+            if source_text is None:
+                source_text = content['text'][:QUOTE_TEXT_LIMIT]
+            
             prompt = f"""
             You are helping with academic citation. Given a claim and a source text, extract the most relevant and supportive quote.
 
             Claim: {claim}
 
-            Source text: {content['text'][:2000]}  # Limit text length
+            Source text: {source_text}
 
             Extract a concise quote (1-3 sentences) that best supports the claim. The quote should:
             - Directly relate to the claim
@@ -709,122 +1119,129 @@ class CitationProcessor:
         Returns:
             Metadata dictionary compatible with enhanced CitationFormatter
         """
-        try:
-            # Convert authors list to single string
-            authors_str = ""
-            if bib_entry.get('authors'):
-                authors_str = ", ".join(bib_entry['authors'])
-            
-            # Extract enhanced academic fields
-            return {
-                'title': bib_entry.get('title', ''),
-                'author': authors_str,
-                'creation_date': bib_entry.get('year', ''),
-                'subject': bib_entry.get('journal', ''),  # Keep for backward compatibility
-                'journal': bib_entry.get('journal', ''),
-                'volume': bib_entry.get('volume', ''),
-                'issue': bib_entry.get('issue', ''),
-                'pages': bib_entry.get('pages', ''),
-                'publisher': bib_entry.get('publisher', ''),
-                'doi': bib_entry.get('doi', ''),
-                'url': bib_entry.get('url', ''),
-                'isbn': bib_entry.get('isbn', ''),
-                'issn': bib_entry.get('issn', ''),
-                'editor': bib_entry.get('editor', ''),
-                'edition': bib_entry.get('edition', ''),
-                'place': bib_entry.get('place', ''),
-                'conference': bib_entry.get('conference', ''),
-                'book_title': bib_entry.get('book_title', ''),  # For book chapters
-                'series': bib_entry.get('series', '')
-            }
-        except Exception as e:
-            print(f"Error converting bibliography to metadata: {str(e)}")
-            return {}
+        # Extract enhanced academic fields, then convert the authors list to a single string
+        metadata = {field: bib_entry.get(bib_field, '') for field, bib_field in _BIB_FIELD_MAP.items()}
+        metadata['author'] = ", ".join(bib_entry.get('authors') or ())
+        return metadata
     
-    def _insert_citation(self, text: str, claim: str, supporting_content: Dict, citation_formatter=None) -> str:
+    def _insert_citations(self, text: str, cited_claims: List[Tuple[str, Dict]], citation_formatter=None) -> str:
         """
-        Insert citation and quote into the text after the claim.
+        Insert citations and quotes into the text after their claims in a single rebuild.
         
         Args:
             text: Original text
-            claim: The claim to cite
-            supporting_content: Supporting content info
+            cited_claims: (claim, supporting content) pairs in processing order
+            citation_formatter: CitationFormatter instance with selected style
             
         Returns:
-            Text with citation inserted
+            Text with citations inserted
         """
-        try:
-            # Find the claim in the text
-            claim_position = text.find(claim)
-            
-            if claim_position == -1:
-                # If exact match not found, try partial matching
-                sentences = nltk.sent_tokenize(text)
-                for sentence in sentences:
-                    if self._sentences_similar(claim, sentence):
-                        claim_position = text.find(sentence)
-                        claim = sentence
-                        break
-            
-            if claim_position != -1:
-                # Create proper in-text citation using selected formatter
-                if citation_formatter:
-                    # Get source info for proper in-text citation
-                    pdf_content = self.pdf_library.get_pdf_content(supporting_content['source']) if hasattr(self, 'pdf_library') else None
-                    
-                    if pdf_content:
-                        source_info = {
-                            'filename': supporting_content['source'],
-                            'metadata': pdf_content.get('metadata', {})
-                        }
-                        citation_text = f" {citation_formatter.format_in_text_citation(source_info, supporting_content['page'])}"
-                    else:
-                        # Fallback to basic format
-                        citation_text = f" ({supporting_content['citation'].split('(')[0].strip()}, {supporting_content['page']})"
-                else:
-                    # Fallback when no formatter provided
-                    citation_text = f" ({supporting_content['citation'].split('(')[0].strip()}, {supporting_content['page']})"
+        insertions = []
+        search_from = {}  # claim -> offset just past its last cited occurrence
+        text_index = None
+        
+        for claim, supporting_content in cited_claims:
+            try:
+                if not claim:
+                    continue
                 
-                quote_text = f' "{supporting_content["quote"]}"'
+                # Find the claim in the original text, skipping occurrences that were already cited
+                start = search_from.get(claim, 0)
+                claim_position = text.find(claim, start)
+                matched_text = claim
                 
-                # Insert after the claim
-                insert_position = claim_position + len(claim)
+                if claim_position == -1 and start == 0:
+                    # If exact match not found, use the most similar sentence of the paper
+                    if text_index is None:
+                        text_index = self._prepare_text_index(text)
+                    sentences, offsets = text_index
+                    match = fuzz_process.extractOne(
+                        claim,
+                        sentences,
+                        scorer=fuzz.token_sort_ratio,
+                        processor=fuzz_utils.default_process,
+                        score_cutoff=SENTENCE_MATCH_MIN_SCORE
+                    )
+                    if match:
+                        matched_text, _, sentence_idx = match
+                        claim_position = offsets[sentence_idx]
                 
-                # Insert citation and quote
-                new_text = (
-                    text[:insert_position] + 
-                    citation_text + 
-                    quote_text + 
-                    text[insert_position:]
-                )
+                if claim_position == -1:
+                    continue
                 
-                return new_text
-            
-            return text
+                # Insert after the claim
+                insert_position = claim_position + len(matched_text)
+                search_from[claim] = insert_position
+                insertions.append((insert_position, self._format_citation_insertion(supporting_content, citation_formatter)))
+                
+            except Exception as e:
+                print(f"Error inserting citation: {str(e)}")
+        
+        # Splice every insertion into the original text in document order
+        insertions.sort(key=lambda insertion: insertion[0])
+        parts = []
+        previous_position = 0
+        for insert_position, insertion_text in insertions:
+            parts.append(text[previous_position:insert_position])
+            parts.append(insertion_text)
+            previous_position = insert_position
+        parts.append(text[previous_position:])
+        
+        return ''.join(parts)
+    
+    def _prepare_text_index(self, text: str) -> Tuple[List[str], List[int]]:
+        """
+        Split the text into sentences and record where each one starts.
+        
+        Args:
+            text: Original text
             
-        except Exception as e:
-            print(f"Error inserting citation: {str(e)}")
-            return text
+        Returns:
+            Tuple of (sentences, start offset of each sentence in the text, -1 if not found verbatim)
+        """
+        sentences = []
+        offsets = []
+        search_start = 0
+        for sentence in _sent_tokenize(text):
+            offset = text.find(sentence, search_start)
+            if offset != -1:
+                search_start = offset + len(sentence)
+            sentences.append(sentence)
+            offsets.append(offset)
+        return sentences, offsets
     
-    def _sentences_similar(self, sent1: str, sent2: str, threshold: float = 0.7) -> bool:
+    def _format_citation_insertion(self, supporting_content: Dict, citation_formatter=None) -> str:
         """
-        Check if two sentences are similar using TF-IDF similarity.
+        Build the in-text citation and quote placed after a claim.
         
         Args:
-            sent1: First sentence
-            sent2: Second sentence
-            threshold: Similarity threshold
+            supporting_content: Supporting content info
+            citation_formatter: CitationFormatter instance with selected style
             
         Returns:
-            True if sentences are similar
+            Citation and quote text, including the leading spaces
         """
-        try:
-            vectorizer = TfidfVectorizer(stop_words='english')
-            tfidf_matrix = vectorizer.fit_transform([sent1, sent2])
-            similarity = cosine_similarity(tfidf_matrix[0], tfidf_matrix[1])[0][0]
-            return similarity > threshold
-        except:
-            return False
+        # Create proper in-text citation using selected formatter
+        if citation_formatter:
+            # Get source info for proper in-text citation
+            pdf_content = self.pdf_library.get_pdf_content(supporting_content['source']) if hasattr(self, 'pdf_library') else None
+            
+            if pdf_content:
+                source_info = {
+                    'filename': supporting_content['source'],
+                    'metadata': pdf_content.get('metadata', {})
+                }
+                citation_text = f" {citation_formatter.format_in_text_citation(source_info, supporting_content['page'])}"
+            else:
+                # Fallback to basic format
+                citation_text = f" ({supporting_content['citation'].split('(')[0].strip()}, {supporting_content['page']})"
+        else:
+            # Fallback when no formatter provided
+            citation_text = f" ({supporting_content['citation'].split('(')[0].strip()}, {supporting_content['page']})"
+        
+        quote_text = f' "{supporting_content["quote"]}"'
+        
+        return citation_text + quote_text
     
     def _generate_references_list(self, citations: List[Dict], citation_formatter=None) -> str:
         """
@@ -842,61 +1259,14 @@ class CitationProcessor:
         
         try:
             if citation_formatter:
-                # Enhance citations with comprehensive metadata for better reference formatting
+                # Enhance citations with comprehensive metadata, built once per source
+                source_metadata = {}
                 enhanced_citations = []
                 for citation in citations:
-                    enhanced_citation = citation.copy()
-                    
-                    # Start with empty metadata
-                    comprehensive_metadata = {}
-                    
-                    # Get PDF metadata if available
-                    if hasattr(self, 'pdf_library'):
-                        pdf_content = self.pdf_library.get_pdf_content(citation['source'])
-                        if pdf_content:
-                            comprehensive_metadata.update(pdf_content.get('metadata', {}))
-                    
-                    # Enhance with bibliography metadata if available and more complete
-                    if hasattr(self, 'bibliography_parser') and self.bibliography_parser:
-                        bib_entry = self.bibliography_parser.find_matching_entry(
-                            citation['source'], 
-                            comprehensive_metadata
-                        )
-                        if bib_entry:
-                            # Merge bibliography data with PDF metadata
-                            # Bibliography data takes precedence for bibliographic fields
-                            bibliographic_fields = {
-                                'title': bib_entry.get('title', ''),
-                                'authors': bib_entry.get('authors', []),
-                                'author': ', '.join(bib_entry.get('authors', [])),  # For compatibility
-                                'year': bib_entry.get('year', ''),
-                                'journal': bib_entry.get('journal', ''),
-                                'volume': bib_entry.get('volume', ''),
-                                'issue': bib_entry.get('issue', ''),
-                                'pages': bib_entry.get('pages', ''),
-                                'doi': bib_entry.get('doi', ''),
-                                'url': bib_entry.get('url', ''),
-                                'publisher': bib_entry.get('publisher', ''),
-                                'editor': bib_entry.get('editor', ''),
-                                'edition': bib_entry.get('edition', ''),
-                                'type': bib_entry.get('type', 'unknown')
-                            }
-                            
-                            # Update comprehensive metadata with non-empty bibliography fields
-                            for field, value in bibliographic_fields.items():
-                                if value:  # Only use non-empty bibliography values
-                                    comprehensive_metadata[field] = value
-                                elif field not in comprehensive_metadata:
-                                    comprehensive_metadata[field] = value  # Set empty default if not in PDF metadata
-                    
-                    # Ensure we have essential fields even if empty
-                    essential_fields = ['title', 'authors', 'author', 'year', 'journal', 'volume', 'issue', 'pages', 'doi', 'url', 'publisher']
-                    for field in essential_fields:
-                        if field not in comprehensive_metadata:
-                            comprehensive_metadata[field] = '' if field != 'authors' else []
-                    
-                    enhanced_citation['metadata'] = comprehensive_metadata
-                    enhanced_citations.append(enhanced_citation)
+                    source = citation['source']
+                    if source not in source_metadata:
+                        source_metadata[source] = self._reference_metadata(source)
+                    enhanced_citations.append({**citation, 'metadata': source_metadata[source]})
                 
                 # Use selected formatter for proper reference list formatting
                 return citation_formatter.format_reference_list(enhanced_citations)
@@ -908,6 +1278,38 @@ class CitationProcessor:
             print(f"Error generating references with formatter: {str(e)}")
             return self._generate_fallback_references_list(citations)
     
+    def _reference_metadata(self, source: str) -> Dict:
+        """
+        Merge PDF and bibliography metadata for a source's reference entry.
+        
+        Args:
+            source: Filename of the cited PDF
+            
+        Returns:
+            Metadata with bibliography values taking precedence and essential fields always present
+        """
+        # Start with PDF metadata if available
+        metadata = {}
+        if hasattr(self, 'pdf_library'):
+            pdf_content = self.pdf_library.get_pdf_content(source)
+            if pdf_content:
+                metadata.update(pdf_content.get('metadata', {}))
+        
+        # Bibliography data takes precedence for bibliographic fields when non-empty
+        missing_fields = ESSENTIAL_REFERENCE_FIELDS
+        if hasattr(self, 'bibliography_parser') and self.bibliography_parser:
+            bib_entry = self.bibliography_parser.find_matching_entry(source, metadata)
+            if bib_entry:
+                bibliographic_fields = {field: bib_entry.get(field) for field in BIBLIOGRAPHY_REFERENCE_FIELDS}
+                bibliographic_fields['author'] = ', '.join(bib_entry.get('authors', []))  # For compatibility
+                bibliographic_fields['type'] = bib_entry.get('type', 'unknown')
+                metadata.update({field: value for field, value in bibliographic_fields.items() if value})
+                missing_fields = BIBLIOGRAPHY_REFERENCE_FIELDS
+        
+        # Ensure we have the expected fields even if empty
+        metadata.update({field: [] if field == 'authors' else '' for field in missing_fields if field not in metadata})
+        return metadata
+    
     def _generate_fallback_references_list(self, citations: List[Dict]) -> str:
         """
         Generate a simple fallback references list when formatter is unavailable.
@@ -918,17 +1320,15 @@ class CitationProcessor:
         Returns:
             Simple formatted references list
         """
-        references = []
-        seen_sources = set()
-        
+        # One reference per source, keeping the first citation seen for it
+        references_by_source = {}
         for citation in citations:
             source = citation['source']
-            if source not in seen_sources:
-                references.append(citation.get('citation', citation.get('apa_citation', source)))
-                seen_sources.add(source)
+            if source not in references_by_source:
+                references_by_source[source] = citation.get('citation', citation.get('apa_citation', source))
         
-        # Sort alphabetically by author (simplified)
-        references.sort()
+        # Sort alphabetically by author (simplified, case-insensitive)
+        references = sorted(references_by_source.values(), key=str.lower)
         
         references_text = "References\n\n" + "\n\n".join(references)
         return references_text
@@ -1,14 +1,129 @@
+import hashlib
 import io
-import tempfile
+import multiprocessing
 import os
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
 import PyPDF2
+from charset_normalizer import from_bytes
 from docx import Document
+from cache_utils import cache_put
+
+# Number of parsed documents kept in memory (keyed by content hash)
+PARSE_CACHE_SIZE = 64
+
+# Number of opened PDF readers / DOCX documents kept for reuse between validation, info and parsing
+OPEN_DOCUMENT_CACHE_SIZE = 4
+
+# PDFs with fewer pages are extracted serially; process startup would cost more than it saves
+PARALLEL_PDF_MIN_PAGES = 8
+
+# Encodings considered for text files that are not valid UTF-8 (charset-normalizer codec names)
+TEXT_ENCODINGS = ['utf_8', 'utf_16', 'cp1252', 'latin_1']
+
+# Workers are spawned rather than forked: forking the multi-threaded Streamlit server is unsafe
+_WORKER_CONTEXT = multiprocessing.get_context('spawn')
+
+# PDF reader of the document being extracted, opened once per worker process
+_worker_pdf_reader = None
+
+def _decode_text(data: bytes) -> Optional[str]:
+    """
+    Decode text file bytes: strict UTF-8 first, then detection limited to TEXT_ENCODINGS.
+    
+    Args:
+        data: Raw file bytes
+        
+    Returns:
+        Decoded text, or None if no supported encoding fits
+    """
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    
+    # Unconstrained detection mistakes short Western-European text for e.g. mac_latin2
+    result = from_bytes(data, cp_isolation=TEXT_ENCODINGS).best()
+    if result is not None:
+        return str(result)
+    
+    # Detection is unsure on very short files; fall back to the ordered guesses
+    for encoding in ('cp1252', 'latin-1'):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+def _extract_reader_pages(pdf_reader, page_range: range) -> List[str]:
+    """Extract the stripped text of a range of pages; unreadable pages give an empty string."""
+    texts = []
+    for page_index in page_range:
+        try:
+            texts.append((pdf_reader.pages[page_index].extract_text() or '').strip())
+        except Exception as e:
+            print(f"Error extracting text from page {page_index + 1}: {str(e)}")
+            texts.append('')
+    return texts
+
+def _init_pdf_worker(data: bytes) -> None:
+    """Open the PDF once in each worker process."""
+    global _worker_pdf_reader
+    _worker_pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+
+def _extract_worker_pages(page_range: range) -> List[str]:
+    """Extract a range of pages from the worker's PDF."""
+    return _extract_reader_pages(_worker_pdf_reader, page_range)
 
 class DocumentParser:
     def __init__(self):
         """Initialize the document parser."""
-        pass
+        # Parse results keyed by SHA-256 of the file bytes, so re-uploads skip parsing
+        self._text_cache: Dict[str, str] = {}
+        self._info_cache: Dict[str, dict] = {}
+        self._open_documents: Dict[str, Any] = {}
+    
+    def _read_upload(self, uploaded_file) -> tuple[bytes, str]:
+        """
+        Read the uploaded file's bytes once and fingerprint them.
+        
+        Args:
+            uploaded_file: Streamlit uploaded file object
+            
+        Returns:
+            Tuple of (file bytes, SHA-256 hex digest)
+        """
+        uploaded_file.seek(0)
+        data = uploaded_file.read()
+        uploaded_file.seek(0)
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return data, hashlib.sha256(data).hexdigest()
+    
+    def _open_document(self, data: bytes, cache_key: str, file_extension: str) -> Any:
+        """
+        Open the file's PDF reader or DOCX document once and reuse it for later calls.
+        
+        Args:
+            data: File bytes
+            cache_key: Extension and content hash of the file
+            file_extension: Lowercase file extension
+            
+        Returns:
+            PyPDF2 PdfReader for PDFs, python-docx Document for DOCX, None otherwise
+        """
+        if cache_key in self._open_documents:
+            return self._open_documents[cache_key]
+        
+        if file_extension == 'pdf':
+            document = PyPDF2.PdfReader(io.BytesIO(data))
+        elif file_extension == 'docx':
+            document = Document(io.BytesIO(data))
+        else:
+            return None
+        
+        cache_put(self._open_documents, cache_key, document, OPEN_DOCUMENT_CACHE_SIZE)
+        return document
     
     def parse_document(self, uploaded_file) -> Optional[str]:
         """
@@ -26,46 +141,42 @@ class DocumentParser:
         file_extension = uploaded_file.name.lower().split('.')[-1]
         
         try:
-            # Reset file pointer
-            uploaded_file.seek(0)
+            data, digest = self._read_upload(uploaded_file)
+            cache_key = f"{file_extension}:{digest}"
+            if cache_key in self._text_cache:
+                return self._text_cache[cache_key]
             
             if file_extension == 'pdf':
-                return self._parse_pdf(uploaded_file)
+                text = self._parse_pdf(data, self._open_document(data, cache_key, file_extension))
             elif file_extension == 'docx':
-                return self._parse_docx(uploaded_file)
+                text = self._parse_docx(self._open_document(data, cache_key, file_extension))
             elif file_extension == 'txt':
-                return self._parse_txt(uploaded_file)
+                text = self._parse_txt(io.BytesIO(data))
             else:
                 print(f"Unsupported file type: {file_extension}")
                 return None
+            
+            if text is not None:
+                cache_put(self._text_cache, cache_key, text, PARSE_CACHE_SIZE)
+            return text
                 
         except Exception as e:
             print(f"Error parsing document {uploaded_file.name}: {str(e)}")
             return None
     
-    def _parse_pdf(self, pdf_file) -> Optional[str]:
+    def _parse_pdf(self, data: bytes, pdf_reader) -> Optional[str]:
         """
         Parse PDF file and extract text.
         
         Args:
-            pdf_file: PDF file object
+            data: PDF file bytes
+            pdf_reader: PyPDF2 PdfReader opened on the bytes
             
         Returns:
             Extracted text or None
         """
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-            
-            text_content = []
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text_content.append(page_text.strip())
-                except Exception as e:
-                    print(f"Error extracting text from page {page_num}: {str(e)}")
-                    continue
+            text_content = [page_text for page_text in self._extract_pdf_pages(data, pdf_reader) if page_text]
             
             if text_content:
                 return "\n\n".join(text_content)
@@ -77,52 +188,66 @@ class DocumentParser:
             print(f"Error parsing PDF: {str(e)}")
             return None
     
-    def _parse_docx(self, docx_file) -> Optional[str]:
+    def _extract_pdf_pages(self, data: bytes, pdf_reader) -> List[str]:
+        """
+        Extract the text of every page in page order, spreading long PDFs across processes.
+        
+        Args:
+            data: PDF file bytes
+            pdf_reader: PyPDF2 PdfReader already opened on the bytes
+            
+        Returns:
+            List of stripped page texts (empty for pages without readable text)
+        """
+        page_count = len(pdf_reader.pages)
+        workers = min((os.cpu_count() or 1) - 1, page_count // PARALLEL_PDF_MIN_PAGES)
+        if page_count < PARALLEL_PDF_MIN_PAGES or workers < 2:
+            return _extract_reader_pages(pdf_reader, range(page_count))
+        
+        # Contiguous page ranges, a few per worker, so results come back in page order
+        chunk_size = max(1, -(-page_count // (4 * workers)))
+        page_ranges = [range(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+        
+        try:
+            with ProcessPoolExecutor(workers, mp_context=_WORKER_CONTEXT, initializer=_init_pdf_worker, initargs=(data,)) as executor:
+                return [page_text for texts in executor.map(_extract_worker_pages, page_ranges) for page_text in texts]
+        except Exception as e:
+            print(f"Parallel PDF extraction failed, falling back to serial: {str(e)}")
+            return _extract_reader_pages(pdf_reader, range(page_count))
+    
+    def _parse_docx(self, doc) -> Optional[str]:
         """
         Parse DOCX file and extract text.
         
         Args:
-            docx_file: DOCX file object
+            doc: python-docx Document
             
         Returns:
             Extracted text or None
         """
         try:
-            # Create a temporary file since python-docx needs a file path
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-                tmp_file.write(docx_file.read())
-                tmp_file_path = tmp_file.name
+            text_content = []
             
-            try:
-                doc = Document(tmp_file_path)
-                
-                text_content = []
-                
-                # Extract text from paragraphs
-                for paragraph in doc.paragraphs:
-                    if paragraph.text.strip():
-                        text_content.append(paragraph.text.strip())
-                
-                # Extract text from tables
-                for table in doc.tables:
-                    for row in table.rows:
-                        row_text = []
-                        for cell in row.cells:
-                            if cell.text.strip():
-                                row_text.append(cell.text.strip())
-                        if row_text:
-                            text_content.append(" | ".join(row_text))
-                
-                if text_content:
-                    return "\n\n".join(text_content)
-                else:
-                    print("No readable text found in DOCX")
-                    return None
-                    
-            finally:
-                # Clean up temporary file
-                if os.path.exists(tmp_file_path):
-                    os.unlink(tmp_file_path)
+            # Extract text from paragraphs
+            for paragraph in doc.paragraphs:
+                if paragraph.text.strip():
+                    text_content.append(paragraph.text.strip())
+            
+            # Extract text from tables
+            for table in doc.tables:
+                for row in table.rows:
+                    row_text = []
+                    for cell in row.cells:
+                        if cell.text.strip():
+                            row_text.append(cell.text.strip())
+                    if row_text:
+                        text_content.append(" | ".join(row_text))
+            
+            if text_content:
+                return "\n\n".join(text_content)
+            else:
+                print("No readable text found in DOCX")
+                return None
                 
         except Exception as e:
             print(f"Error parsing DOCX: {str(e)}")
@@ -139,30 +264,17 @@ class DocumentParser:
             Extracted text or None
         """
         try:
-            # Try different encodings
-            encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
+            content = txt_file.read()
+            if isinstance(content, str):
+                return content.strip() or None
             
-            for encoding in encodings:
-                try:
-                    txt_file.seek(0)
-                    content = txt_file.read()
-                    
-                    if isinstance(content, bytes):
-                        text = content.decode(encoding)
-                    else:
-                        text = content
-                    
-                    if text.strip():
-                        return text.strip()
-                        
-                except UnicodeDecodeError:
-                    continue
-                except Exception as e:
-                    print(f"Error with encoding {encoding}: {str(e)}")
-                    continue
+            text = _decode_text(content)
+            if text is None:
+                print("Could not decode text file with any supported encoding")
+                return None
             
-            print("Could not decode text file with any supported encoding")
-            return None
+            text = text.strip()
+            return text or None
             
         except Exception as e:
             print(f"Error parsing TXT: {str(e)}")
@@ -182,9 +294,8 @@ class DocumentParser:
             return {}
         
         file_extension = uploaded_file.name.lower().split('.')[-1]
-        file_size = uploaded_file.size if hasattr(uploaded_file, 'size') else len(uploaded_file.read())
-        
-        uploaded_file.seek(0)  # Reset after reading size
+        data, digest = self._read_upload(uploaded_file)
+        file_size = uploaded_file.size if hasattr(uploaded_file, 'size') else len(data)
         
         info = {
             'filename': uploaded_file.name,
@@ -193,40 +304,40 @@ class DocumentParser:
             'file_size_mb': round(file_size / (1024 * 1024), 2)
         }
         
+        # Reuse the details of a previously seen copy of this file
+        cache_key = f"{file_extension}:{digest}"
+        if cache_key in self._info_cache:
+            info.update(self._info_cache[cache_key])
+            return info
+        
         # Try to get additional info based on file type
+        details = {}
         try:
             if file_extension == 'pdf':
-                uploaded_file.seek(0)
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.read()))
-                info['page_count'] = len(pdf_reader.pages)
+                pdf_reader = self._open_document(data, cache_key, file_extension)
+                details['page_count'] = len(pdf_reader.pages)
                 
                 if pdf_reader.metadata:
-                    info['title'] = pdf_reader.metadata.get('/Title', '')
-                    info['author'] = pdf_reader.metadata.get('/Author', '')
+                    details['title'] = pdf_reader.metadata.get('/Title', '')
+                    details['author'] = pdf_reader.metadata.get('/Author', '')
                     
             elif file_extension == 'docx':
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-                    uploaded_file.seek(0)
-                    tmp_file.write(uploaded_file.read())
-                    tmp_file_path = tmp_file.name
+                doc = self._open_document(data, cache_key, file_extension)
+                details['paragraph_count'] = len(doc.paragraphs)
+                details['table_count'] = len(doc.tables)
                 
-                try:
-                    doc = Document(tmp_file_path)
-                    info['paragraph_count'] = len(doc.paragraphs)
-                    info['table_count'] = len(doc.tables)
-                    
-                    # Try to get document properties
-                    if doc.core_properties:
-                        info['title'] = doc.core_properties.title or ''
-                        info['author'] = doc.core_properties.author or ''
-                        
-                finally:
-                    if os.path.exists(tmp_file_path):
-                        os.unlink(tmp_file_path)
-                        
+                # Try to get document properties
+                if doc.core_properties:
+                    details['title'] = doc.core_properties.title or ''
+                    details['author'] = doc.core_properties.author or ''
+            
+            cache_put(self._info_cache, cache_key, details, PARSE_CACHE_SIZE)
+        
         except Exception as e:
             print(f"Error getting document info: {str(e)}")
         
+        info.update(details)
+        
         return info
     
     def validate_document(self, uploaded_file) -> tuple[bool, str]:
@@ -253,14 +364,20 @@ class DocumentParser:
         if hasattr(uploaded_file, 'size') and uploaded_file.size > max_size:
             return False, f"File too large. Maximum size: 50MB"
         
-        # Try to parse a small portion to validate format
+        # Check the file header (or a small sample) rather than parsing the whole file
         try:
             uploaded_file.seek(0)
             
             if file_extension == 'pdf':
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.read()[:10000]))
-                if len(pdf_reader.pages) == 0:
+                header = uploaded_file.read(1024)
+                if b'%PDF-' not in header:  # The signature may follow a few bytes of junk
                     return False, "PDF appears to be empty or corrupted"
+                
+                # A complete PDF ends with an end-of-file marker (possibly followed by padding)
+                uploaded_file.seek(0, os.SEEK_END)
+                uploaded_file.seek(max(0, uploaded_file.tell() - 1024))
+                if b'%%EOF' not in uploaded_file.read(1024):
+                    return False, "PDF appears to be truncated or corrupted"
                     
             elif file_extension == 'docx':
                 # Basic validation by trying to read file header
@@ -269,16 +386,10 @@ class DocumentParser:
                     return False, "File does not appear to be a valid DOCX document"
                     
             elif file_extension == 'txt':
-                # Try to decode a portion of the file
-                content = uploaded_file.read(1000)
-                if isinstance(content, bytes):
-                    try:
-                        content.decode('utf-8')
-                    except UnicodeDecodeError:
-                        try:
-                            content.decode('latin-1')
-                        except UnicodeDecodeError:
-                            return False, "Text file encoding not supported"
+                # Decode the first 4 KB
+                content = uploaded_file.read(4096)
+                if isinstance(content, bytes) and content and _decode_text(content) is None:
+                    return False, "Text file encoding not supported"
             
             uploaded_file.seek(0)  # Reset file pointer
             return True, "Document is valid"
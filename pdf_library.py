@@ -1,12 +1,439 @@
 import PyPDF2
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
+import copy
+import functools
+import hashlib
 import io
+import multiprocessing
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from cache_utils import cache_put
+
+# PyMuPDF extracts text far faster than PyPDF2; PyPDF2 remains the fallback
+try:
+    import pymupdf
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    pymupdf = None
+    PYMUPDF_AVAILABLE = False
+
+# PyPDF2 document-info keys for the property names PyMuPDF uses
+PYPDF2_PROPERTY_KEYS = {
+    'title': '/Title',
+    'author': '/Author',
+    'subject': '/Subject',
+    'creator': '/Creator',
+    'producer': '/Producer',
+    'creationDate': '/CreationDate',
+    'modDate': '/ModDate'
+}
+
+# Patterns used by the metadata extractors, compiled once
+_TITLE_PREFIX_RE = re.compile(r'^(Microsoft Word - |Adobe PDF - )', re.IGNORECASE)
+_EXT_RE = re.compile(r'\.(pdf|doc|docx)$', re.IGNORECASE)
+_WS_RE = re.compile(r'\s+')
+_PAREN_RE = re.compile(r'\([^)]*\)')
+_ANGLE_RE = re.compile(r'<[^>]*>')
+_YEAR_RE = re.compile(r'(\d{4})')
+# DOI with an optional "doi:" / doi.org prefix; one scan finds prefixed and bare DOIs alike
+_DOI_RE = re.compile(r'(?:doi:\s*|(?:dx\.)?doi\.org/)?(10\.\d{4,9}/[^\s,;]+)', re.IGNORECASE)
+_SPECIAL_CHAR_RE = re.compile(r'[^\w\s]')
+_AUTHOR_PREFIX_RE = re.compile(r'^.*?(author|by)\s*:?\s*', re.IGNORECASE)
+_NAME_RE = re.compile(r'([A-Z][a-z]+ [A-Z][a-z]+(?:,\s*[A-Z][a-z]+ [A-Z][a-z]+)*)')
+_JOURNAL_SUFFIX_RE = re.compile(r'(volume|vol|issue|no|pp?\.)\s*\d+.*$', re.IGNORECASE)
+_YEAR_SUFFIX_RE = re.compile(r'\d{4}.*$')
+_VOL_RE = re.compile(r'vol(?:ume)?\s*\.?\s*(\d+)', re.IGNORECASE)
+_ISSUE_RE = re.compile(r'(?:issue|no|number)\s*\.?\s*(\d+)', re.IGNORECASE)
+_PAGE_RE = re.compile(r'pp?\.\s*(\d+(?:-\d+)?)', re.IGNORECASE)
+# Capture bounded so a missing section header cannot trigger a scan of the rest of the text from every 'abstract'
+ABSTRACT_MAX_CHARS = 2000
+_ABSTRACT_RE = re.compile(
+    r'abstract\s*[:\-]?\s*(.{0,%d}?)(?=\n\s*(?:keywords|introduction|1\.|\d+\.|references)|\Z)' % ABSTRACT_MAX_CHARS,
+    re.IGNORECASE | re.DOTALL
+)
+_SENTENCE_RE = re.compile(r'[^.!?]+')  # Text between sentence-ending punctuation
+
+# Keyword sets matched as one alternation each (substring matches, like the original `in` checks)
+_TITLE_SKIP_RE = re.compile(r'page|volume|journal|doi|abstract|keywords|introduction', re.IGNORECASE)
+_TITLE_STOP_RE = re.compile(r'author|university|department|email', re.IGNORECASE)
+_AUTHOR_HINT_RE = re.compile(r'author|by ', re.IGNORECASE)
+_JOURNAL_HINT_RE = re.compile(r'journal|proceedings|conference|international|ieee|acm|springer|elsevier', re.IGNORECASE)
+_PUB_RE = re.compile(r'\b(springer|elsevier|ieee|acm|wiley|taylor|francis|sage|oxford|cambridge)\b', re.IGNORECASE)
+_YEAR_CONTEXT_RE = re.compile(r'published|copyright|©|journal|conference|proceedings', re.IGNORECASE)
+_ACADEMIC_KEYWORD_RE = re.compile(r'abstract|introduction|methodology|references|conclusion|keywords|doi')
+
+# Cheap check for paper-like front matter before running the metadata extractors
+_ACADEMIC_HINT_RE = re.compile(r'abstract|doi:|introduction|keywords|references|©', re.IGNORECASE)
+ACADEMIC_HINT_WINDOW = 2000  # Characters of the first pages searched for the hints
+
+# Name/keyword delimiters in priority order: a string is split on the first kind it contains
+_AUTHOR_DELIMITERS = (';', ',', ' and ', ' & ', '\n')
+_KEYWORD_DELIMITERS = (';', ',', '|', '\n')
+# Lookahead so delimiters sharing a space (' & and ') are all found
+_AUTHOR_DELIM_RE = re.compile('(?=(' + '|'.join(map(re.escape, _AUTHOR_DELIMITERS)) + '))')
+_KEYWORD_DELIM_RE = re.compile('(?=(' + '|'.join(map(re.escape, _KEYWORD_DELIMITERS)) + '))')
+
+# Distinct title/author/subject strings memoized by the metadata parsers
+METADATA_CACHE_SIZE = 1024
+
+# Extracted entries kept by content hash, so re-uploaded PDFs skip extraction
+ENTRY_CACHE_SIZE = 64
+
+# Words indexed for search (maximal runs of lowercase letters/digits, at least 3 long)
+_TOKEN_RE = re.compile(r'[a-z0-9]{3,}')
+
+def _split_on_delimiter(text: str, delimiter_re: re.Pattern, delimiters: Tuple[str, ...]) -> List[str]:
+    """Split on the highest-priority delimiter present, found with a single scan; [] if none splits."""
+    present = set(delimiter_re.findall(text))
+    for delimiter in delimiters:
+        if delimiter in present:
+            return [part.strip() for part in text.split(delimiter) if part.strip()]
+    return []
+
+@functools.lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _clean_title(title: str) -> str:
+    """Clean and normalize a title string."""
+    if not title:
+        return ''
+    
+    # Remove common prefixes and suffixes
+    title = title.strip()
+    title = _TITLE_PREFIX_RE.sub('', title)
+    title = _EXT_RE.sub('', title)
+    
+    # Remove excessive whitespace
+    title = _WS_RE.sub(' ', title).strip()
+    
+    return title
+
+@functools.lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _parse_authors(author_string: str) -> Tuple[str, ...]:
+    """Parse author string into individual authors (a tuple, so it can be cached)."""
+    if not author_string:
+        return ()
+    
+    # Split by common delimiters
+    authors = _split_on_delimiter(author_string, _AUTHOR_DELIM_RE, _AUTHOR_DELIMITERS)
+    
+    if not authors:
+        authors = [author_string.strip()]
+    
+    # Clean up individual author names
+    cleaned_authors = []
+    for author in authors:
+        # Remove email addresses and affiliations in parentheses
+        author = _PAREN_RE.sub('', author)
+        author = _ANGLE_RE.sub('', author)
+        author = author.strip()
+        if author and len(author) > 2:
+            cleaned_authors.append(author)
+    
+    return tuple(cleaned_authors)
+
+@functools.lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _extract_keywords(subject: str) -> Tuple[str, ...]:
+    """Extract keywords from subject field (a tuple, so it can be cached)."""
+    if not subject:
+        return ()
+    
+    # Split by common delimiters
+    keywords = _split_on_delimiter(subject, _KEYWORD_DELIM_RE, _KEYWORD_DELIMITERS)
+    
+    if not keywords:
+        keywords = [subject.strip()]
+    
+    return tuple(kw for kw in keywords if len(kw) > 2)
+
+def _extract_year_from_date(date_string: str) -> str:
+    """Extract year from date string."""
+    if not date_string:
+        return ''
+    
+    # Try to find 4-digit year
+    year_match = _YEAR_RE.search(date_string)
+    if year_match:
+        year = int(year_match.group(1))
+        # Only return reasonable years for academic papers
+        if 1900 <= year <= 2030:
+            return str(year)
+    
+    return ''
+
+def _extract_doi_from_text(text: str) -> str:
+    """Extract DOI from text using a single combined regex pattern."""
+    if not text:
+        return ''
+    
+    # First DOI in the text, prefixed or not
+    for match in _DOI_RE.finditer(text):
+        doi = match.group(1)
+        # Clean up DOI
+        doi = doi.rstrip('.,;)')  # Remove trailing punctuation
+        if len(doi) > 7:  # Minimum reasonable DOI length
+            return doi
+    
+    return ''
+
+def _extract_title_from_text(text: str) -> str:
+    """Extract title from PDF text content."""
+    if not text:
+        return ''
+    
+    lines = text.split('\n')
+    lines = [line.strip() for line in lines if line.strip()]
+    
+    if not lines:
+        return ''
+    
+    # Look for title in first few lines
+    for i, line in enumerate(lines[:10]):
+        # Skip very short lines or lines with lots of special characters
+        if len(line) < 10 or _SPECIAL_CHAR_RE.subn('', line)[1] / len(line) > 0.3:
+            continue
+        
+        # Skip lines that look like headers, footers, or metadata
+        if _TITLE_SKIP_RE.search(line):
+            continue
+        
+        # Title is likely to be one of the longer lines at the beginning
+        if len(line) > 20 and len(line) < 200:
+            # Check if next lines might be continuation
+            full_title = line
+            for j in range(i + 1, min(i + 3, len(lines))):
+                next_line = lines[j]
+                if len(next_line) > 10 and len(next_line) < 100 and not _TITLE_STOP_RE.search(next_line):
+                    full_title += " " + next_line
+                else:
+                    break
+            
+            return full_title.strip()
+    
+    return ''
+
+def _extract_authors_from_text(text: str) -> List[str]:
+    """Extract authors from PDF text content."""
+    if not text:
+        return []
+    
+    lines = text.split('\n')
+    lines = [line.strip() for line in lines if line.strip()]
+    
+    authors = []
+    
+    # Look for author patterns in first 20 lines
+    for i, line in enumerate(lines[:20]):
+        # Skip very short lines
+        if len(line) < 3:
+            continue
+        
+        # Look for lines that might contain author names
+        # Authors often appear after title and before abstract/keywords
+        if _AUTHOR_HINT_RE.search(line):
+            # Extract names after "author" or "by"
+            author_text = _AUTHOR_PREFIX_RE.sub('', line)
+            if author_text:
+                authors.extend(_parse_authors(author_text))
+        
+        # Look for lines with name patterns (First Last, First Last)
+        matches = _NAME_RE.findall(line)
+        for match in matches:
+            if len(match) > 5 and len(match) < 100:  # Reasonable author name length
+                authors.extend(_parse_authors(match))
+    
+    # Remove duplicates and clean
+    unique_authors = [a for a in dict.fromkeys(authors) if len(a) > 2]
+    
+    return unique_authors[:10]  # Limit to reasonable number
+
+def _extract_journal_info(text: str) -> Dict:
+    """Extract journal, volume, issue, and page information."""
+    info = {'journal': '', 'volume': '', 'issue': '', 'pages': '', 'publisher': ''}
+    
+    if not text:
+        return info
+    
+    lines = text.split('\n')
+    
+    # Look for journal patterns in first 30 lines
+    for line in lines[:30]:
+        line = line.strip()
+        if len(line) < 5:
+            continue
+        
+        # Journal name patterns
+        if _JOURNAL_HINT_RE.search(line):
+            # Extract journal name
+            if not info['journal'] and len(line) < 150:
+                # Clean up potential journal name
+                journal = _JOURNAL_SUFFIX_RE.sub('', line)
+                journal = _YEAR_SUFFIX_RE.sub('', journal)  # Remove year and everything after
+                journal = journal.strip()
+                if len(journal) > 5:
+                    info['journal'] = journal
+        
+        # Volume and issue patterns
+        vol_match = _VOL_RE.search(line)
+        if vol_match and not info['volume']:
+            info['volume'] = vol_match.group(1)
+        
+        issue_match = _ISSUE_RE.search(line)
+        if issue_match and not info['issue']:
+            info['issue'] = issue_match.group(1)
+        
+        # Page patterns
+        page_match = _PAGE_RE.search(line)
+        if page_match and not info['pages']:
+            info['pages'] = page_match.group(1)
+        
+        # Publisher patterns
+        if not info['publisher']:
+            publisher_match = _PUB_RE.search(line)
+            if publisher_match:
+                info['publisher'] = publisher_match.group(1).lower().title()
+    
+    return info
+
+def _extract_year_from_text(text: str) -> str:
+    """Extract publication year from text content."""
+    if not text:
+        return ''
+    
+    # Look for year patterns in first 50 lines
+    header_end = -1
+    for _ in range(50):
+        header_end = text.find('\n', header_end + 1)
+        if header_end == -1:
+            header_end = len(text)
+            break
+    
+    # One scan over the header; only years before 1980 need their line checked for context
+    for year_match in _YEAR_RE.finditer(text, 0, header_end):
+        year = int(year_match.group(1))
+        if 1980 <= year <= 2030:
+            return year_match.group(1)
+        if 1900 <= year < 1980:
+            # Older years count only near publication-related keywords
+            line_start = text.rfind('\n', 0, year_match.start()) + 1
+            line_end = text.find('\n', year_match.end())
+            if _YEAR_CONTEXT_RE.search(text, line_start, line_end if line_end != -1 else len(text)):
+                return year_match.group(1)
+    
+    return ''
+
+def _extract_abstract(text: str) -> str:
+    """Extract abstract from PDF text."""
+    if not text:
+        return ''
+    
+    # Look for abstract section
+    match = _ABSTRACT_RE.search(text)
+    
+    if match:
+        abstract = match.group(1).strip()
+        # Clean up the abstract
+        abstract = _WS_RE.sub(' ', abstract)
+        if 50 < len(abstract) < ABSTRACT_MAX_CHARS:  # Reasonable abstract length
+            return abstract
+    
+    return ''
+
+def _split_into_chunks(text: str, chunk_size: int = 500) -> List[str]:
+    """
+    Split text into smaller chunks for better processing.
+    
+    Args:
+        text: Text to split
+        chunk_size: Approximate size of each chunk
+        
+    Returns:
+        List of text chunks
+    """
+    chunks = []
+    current_sentences = []
+    current_length = 0  # Length of the current sentences joined with spaces
+    
+    # Scan sentence by sentence, joining each chunk's sentences once
+    for match in _SENTENCE_RE.finditer(text):
+        sentence = match.group().strip()
+        if not sentence:
+            continue
+        
+        # If adding this sentence would exceed chunk size, start new chunk
+        if current_sentences and current_length + len(sentence) > chunk_size:
+            chunks.append(" ".join(current_sentences))
+            current_sentences = [sentence]
+            current_length = len(sentence)
+        else:
+            current_length += len(sentence) + (1 if current_sentences else 0)
+            current_sentences.append(sentence)
+    
+    # Add the last chunk
+    if current_sentences:
+        chunks.append(" ".join(current_sentences))
+    
+    return chunks
+
+def _extract_context(text: str, text_lower: str, query_lower: str, context_length: int = 200) -> str:
+    """
+    Extract context around a query match.
+    
+    Args:
+        text: Text to search in
+        text_lower: Lowercased text
+        query_lower: Lowercased query to find
+        context_length: Number of characters of context on each side
+        
+    Returns:
+        Context string
+    """
+    match_pos = text_lower.find(query_lower)
+    if match_pos == -1:
+        return text[:context_length * 2]  # Return beginning if no match
+    
+    start = max(0, match_pos - context_length)
+    end = min(len(text), match_pos + len(query_lower) + context_length)
+    
+    context = text[start:end]
+    
+    # Add ellipsis if we're not at the beginning/end
+    if start > 0:
+        context = "..." + context
+    if end < len(text):
+        context = context + "..."
+    
+    return context
+
+# Workers are spawned rather than forked: forking the multi-threaded Streamlit server is unsafe
+_WORKER_CONTEXT = multiprocessing.get_context('spawn')
+
+def _build_library_entry(filename: str, data: bytes) -> Optional[Dict]:
+    """Extract a PDF's library entry in a worker process."""
+    return PDFLibrary()._build_entry(filename, data)
 
 class PDFLibrary:
     def __init__(self):
         """Initialize the PDF library storage."""
         self.library = {}  # filename -> content dictionary
+        
+        # Inverted index for search_content: word -> ids of pages containing it, rebuilt lazily after changes
+        self._inverted: Dict[str, Set[int]] = {}
+        self._indexed_pages: List[Tuple[str, Dict]] = []  # page id -> (filename, page data)
+        self._index_dirty = True
+        
+        # Search chunks per file and for the whole library, dropped when the library changes
+        self._chunk_cache: Dict[str, List[Dict]] = {}
+        self._all_content_cache: Optional[List[Dict]] = None
+        
+        # Running totals for get_library_stats, updated as files are added and removed
+        self._total_pages = 0
+        self._total_chars = 0
+        
+        # Extracted entries keyed by BLAKE2b of the file bytes, kept after removal for re-uploads;
+        # the library holds copies so edits to a stored entry never reach the cache
+        self._hash_cache: Dict[str, Dict] = {}
+        self._file_digests: Dict[str, str] = {}  # filename -> digest of the bytes it was stored from
     
     def add_pdf(self, pdf_file) -> bool:
         """
@@ -21,43 +448,256 @@ class PDFLibrary:
         try:
             # Reset file pointer
             pdf_file.seek(0)
+            data = pdf_file.read()
             
-            # Create PDF reader
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-            
-            # Extract text from all pages
-            content_by_page = []
-            full_text = ""
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        content_by_page.append({
-                            'page': page_num,
-                            'text': page_text.strip()
-                        })
-                        full_text += page_text + "\n"
-                except Exception as e:
-                    print(f"Error extracting text from page {page_num}: {str(e)}")
-                    continue
-            
-            if content_by_page:
-                self.library[pdf_file.name] = {
-                    'filename': pdf_file.name,
-                    'full_text': full_text,
-                    'pages': content_by_page,
-                    'metadata': self._extract_metadata(pdf_reader)
-                }
-                return True
-            else:
-                print(f"No readable text found in {pdf_file.name}")
-                return False
+            return self._add_data(pdf_file.name, data, hashlib.blake2b(data).hexdigest())
                 
         except Exception as e:
             print(f"Error processing PDF {pdf_file.name}: {str(e)}")
             return False
     
+    def add_pdfs(self, pdf_files: List) -> Dict[str, bool]:
+        """
+        Add several PDF files, extracting them in parallel worker processes.
+        
+        Args:
+            pdf_files: Streamlit uploaded file objects
+            
+        Returns:
+            Dictionary of filename to whether it was successfully added
+        """
+        # Files whose bytes were extracted before are added without a worker
+        results = {}
+        uncached = []
+        for pdf_file in pdf_files:
+            pdf_file.seek(0)
+            data = pdf_file.read()
+            digest = hashlib.blake2b(data).hexdigest()
+            if digest in self._hash_cache:
+                results[pdf_file.name] = self._add_data(pdf_file.name, data, digest)
+            else:
+                uncached.append((pdf_file.name, data, digest))
+        
+        workers = min((os.cpu_count() or 1) - 1, len(uncached))
+        crashed = []
+        if workers >= 2:
+            try:
+                with ProcessPoolExecutor(workers, mp_context=_WORKER_CONTEXT) as executor:
+                    futures = {}
+                    for filename, data, digest in uncached:
+                        futures[filename] = (executor.submit(_build_library_entry, filename, data), data, digest)
+                    
+                    # Entries are stored here in the main process, so the library needs no locking
+                    for filename, (future, data, digest) in futures.items():
+                        try:
+                            entry = future.result()
+                            self._cache_entry(digest, entry)
+                            results[filename] = self._store_entry(filename, self._copy_entry(entry, filename), digest)
+                        except BrokenProcessPool:
+                            # A worker died and took the pending files with it; retry them one per process below
+                            print(f"PDF worker process failed before {filename} was extracted, retrying in isolation")
+                            crashed.append((filename, data, digest))
+                        except Exception as e:
+                            print(f"Error processing PDF {filename}: {str(e)}")
+                            results[filename] = False
+            except Exception as e:
+                print(f"Parallel PDF processing failed, falling back to serial: {str(e)}")
+        
+        # A file that may have crashed its worker is never parsed in this process
+        for filename, data, digest in crashed:
+            results[filename] = self._add_isolated(filename, data, digest)
+        
+        # Serial path for small batches, and for anything the workers did not handle
+        for pdf_file in pdf_files:
+            if pdf_file.name not in results:
+                results[pdf_file.name] = self.add_pdf(pdf_file)
+        
+        return results
+    
+    def _add_isolated(self, filename: str, data: bytes, digest: str) -> bool:
+        """
+        Extract one PDF in its own worker process, failing the file if that process dies.
+        
+        Args:
+            filename: Name of the PDF file
+            data: PDF file bytes
+            digest: BLAKE2b hex digest of the file bytes
+            
+        Returns:
+            True if successfully added, False otherwise
+        """
+        try:
+            with ProcessPoolExecutor(1, mp_context=_WORKER_CONTEXT) as executor:
+                entry = executor.submit(_build_library_entry, filename, data).result()
+        except BrokenProcessPool:
+            print(f"PDF worker process failed while extracting {filename}; skipping it")
+            return False
+        except Exception as e:
+            print(f"Error processing PDF {filename}: {str(e)}")
+            return False
+        
+        self._cache_entry(digest, entry)
+        return self._store_entry(filename, self._copy_entry(entry, filename), digest)
+    
+    def _build_entry(self, filename: str, data: bytes) -> Optional[Dict]:
+        """
+        Extract the library entry (text, pages and metadata) for a PDF.
+        
+        Args:
+            filename: Name of the PDF file
+            data: PDF file bytes
+            
+        Returns:
+            Library entry, or None if the PDF has no readable text
+        """
+        # Extract text from all pages
+        page_texts, pdf_properties = self._read_pdf(data)
+        
+        content_by_page = []
+        full_text_parts = []
+        
+        for page_num, page_text in enumerate(page_texts, 1):
+            page_text_stripped = page_text.strip()
+            if page_text_stripped:
+                content_by_page.append({
+                    'page': page_num,
+                    'text': page_text_stripped,
+                    'text_lower': page_text_stripped.lower()  # Case-folded once for searching
+                })
+                full_text_parts.append(page_text)
+        
+        if not content_by_page:
+            return None
+        
+        return {
+            'filename': filename,
+            'full_text': "\n".join(full_text_parts) + "\n",
+            'pages': content_by_page,
+            'metadata': self._extract_metadata(pdf_properties, page_texts)
+        }
+    
+    def _add_data(self, filename: str, data: bytes, digest: str) -> bool:
+        """
+        Add a PDF's bytes, reusing the entry extracted earlier for identical bytes.
+        
+        Args:
+            filename: Name of the PDF file
+            data: PDF file bytes
+            digest: BLAKE2b hex digest of the bytes
+            
+        Returns:
+            True if the file is in the library, False otherwise
+        """
+        if self._file_digests.get(filename) == digest and filename in self.library:
+            return True  # Already stored from these bytes (e.g. a Streamlit rerun)
+        
+        # Identical bytes were extracted before, possibly under another name; reuse that entry
+        entry = self._hash_cache.get(digest)
+        if entry is None:
+            entry = self._build_entry(filename, data)
+            self._cache_entry(digest, entry)
+        
+        return self._store_entry(filename, self._copy_entry(entry, filename), digest)
+    
+    def _copy_entry(self, entry: Optional[Dict], filename: str) -> Optional[Dict]:
+        """
+        Copy a cached entry for storing in the library under a filename.
+        
+        Metadata and page dictionaries are copied so that changes made to one stored
+        file do not leak into the cache or other files with the same bytes.
+        
+        Args:
+            entry: Cached entry from _build_entry, or None
+            filename: Name the file is being stored under
+            
+        Returns:
+            Independent copy of the entry, or None if there is no entry
+        """
+        if not entry:
+            return entry
+        return {
+            **entry,
+            'filename': filename,
+            'pages': [dict(page_data) for page_data in entry['pages']],
+            'metadata': copy.deepcopy(entry['metadata'])
+        }
+    
+    def _cache_entry(self, digest: str, entry: Optional[Dict]):
+        """Remember an extracted entry by content hash (nothing is cached for PDFs without text)."""
+        if entry:
+            cache_put(self._hash_cache, digest, entry, ENTRY_CACHE_SIZE)
+    
+    def _store_entry(self, filename: str, entry: Optional[Dict], digest: Optional[str] = None) -> bool:
+        """
+        Store an extracted library entry.
+        
+        Args:
+            filename: Name of the PDF file
+            entry: Entry from _build_entry, or None if no text was found
+            digest: BLAKE2b hex digest of the bytes the entry was extracted from
+            
+        Returns:
+            True if stored, False otherwise
+        """
+        if not entry:
+            print(f"No readable text found in {filename}")
+            return False
+        
+        if filename in self.library:
+            self._update_totals(self.library[filename], -1)
+        self.library[filename] = entry
+        if digest:
+            self._file_digests[filename] = digest
+        else:
+            self._file_digests.pop(filename, None)
+        self._update_totals(entry, 1)
+        self._invalidate_caches(filename)
+        return True
+    
+    def _read_pdf(self, data: bytes) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Extract page texts and document properties, using PyMuPDF when available.
+        
+        Args:
+            data: PDF file bytes
+            
+        Returns:
+            Tuple of (text of every page in order, document properties keyed by
+            title/author/subject/creator/producer/creationDate/modDate)
+        """
+        if PYMUPDF_AVAILABLE:
+            try:
+                with pymupdf.open(stream=data, filetype="pdf") as doc:
+                    # Encrypted documents go through PyPDF2, which handles empty passwords
+                    if not doc.needs_pass:
+                        page_texts = []
+                        for page_num, page in enumerate(doc, 1):
+                            try:
+                                page_texts.append(page.get_text("text"))
+                            except Exception as e:
+                                print(f"Error extracting text from page {page_num}: {str(e)}")
+                                page_texts.append('')
+                        return page_texts, {key: value or '' for key, value in (doc.metadata or {}).items()}
+            except Exception as e:
+                print(f"PyMuPDF could not read PDF, falling back to PyPDF2: {str(e)}")
+        
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+        
+        page_texts = []
+        for page_num, page in enumerate(pdf_reader.pages, 1):
+            try:
+                page_texts.append(page.extract_text() or '')
+            except Exception as e:
+                print(f"Error extracting text from page {page_num}: {str(e)}")
+                page_texts.append('')
+        
+        pdf_properties = {}
+        if pdf_reader.metadata:
+            for key, pdf_key in PYPDF2_PROPERTY_KEYS.items():
+                pdf_properties[key] = str(pdf_reader.metadata.get(pdf_key, '') or '')
+        
+        return page_texts, pdf_properties
+    
     def remove_pdf(self, filename: str) -> bool:
         """
         Remove a PDF from the library.
@@ -69,10 +709,23 @@ class PDFLibrary:
             True if removed, False if not found
         """
         if filename in self.library:
-            del self.library[filename]
+            self._update_totals(self.library.pop(filename), -1)
+            self._file_digests.pop(filename, None)
+            self._invalidate_caches(filename)
             return True
         return False
     
+    def _update_totals(self, entry: Dict, sign: int):
+        """Add (sign=1) or subtract (sign=-1) a library entry's pages and characters from the totals."""
+        self._total_pages += sign * len(entry['pages'])
+        self._total_chars += sign * len(entry['full_text'])
+    
+    def _invalidate_caches(self, filename: str):
+        """Drop cached search data after a file is added, replaced or removed."""
+        self._index_dirty = True
+        self._chunk_cache.pop(filename, None)
+        self._all_content_cache = None
+    
     def get_library_files(self) -> List[str]:
         """
         Get list of all files in the library.
@@ -98,26 +751,49 @@ class PDFLibrary:
         """
         Get all content from the library for searching.
         
+        The list is cached until the library changes; callers must not modify it.
+        
         Returns:
             List of content dictionaries with page-level granularity
         """
-        all_content = []
+        if self._all_content_cache is None:
+            all_content = []
+            for filename in self.library:
+                all_content.extend(self._get_file_chunks(filename))
+            self._all_content_cache = all_content
         
-        for filename, pdf_data in self.library.items():
+        return self._all_content_cache
+    
+    def _get_file_chunks(self, filename: str) -> List[Dict]:
+        """
+        Get the search chunks of one PDF, splitting its pages only once.
+        
+        Args:
+            filename: Name of the PDF file
+            
+        Returns:
+            List of content dictionaries for the file's substantial chunks
+        """
+        if filename not in self._chunk_cache:
+            pdf_data = self.library[filename]
+            file_chunks = []
+            
             for page_data in pdf_data['pages']:
                 # Split page content into chunks for better matching
-                chunks = self._split_into_chunks(page_data['text'])
+                chunks = _split_into_chunks(page_data['text'])
                 
                 for chunk in chunks:
                     if len(chunk.strip()) > 50:  # Only include substantial chunks
-                        all_content.append({
+                        file_chunks.append({
                             'filename': filename,
                             'page': page_data['page'],
                             'text': chunk,
                             'metadata': pdf_data['metadata']
                         })
+            
+            self._chunk_cache[filename] = file_chunks
         
-        return all_content
+        return self._chunk_cache[filename]
     
     def search_content(self, query: str, max_results: int = 10) -> List[Dict]:
         """
@@ -133,30 +809,75 @@ class PDFLibrary:
         results = []
         query_lower = query.lower()
         
+        # Narrow to pages containing every whole word of the query, in library order
+        self._ensure_search_index()
+        postings = [self._inverted.get(token, set()) for token in self._query_words(query_lower)]
+        if postings:
+            postings.sort(key=len)
+            candidates = sorted(postings[0].intersection(*postings[1:]))
+        else:
+            candidates = range(len(self._indexed_pages))
+        
+        for page_id in candidates:
+            filename, page_data = self._indexed_pages[page_id]
+            if query_lower in page_data['text_lower']:
+                # Find the context around the match
+                context = _extract_context(page_data['text'], page_data['text_lower'], query_lower, 200)
+                
+                results.append({
+                    'filename': filename,
+                    'page': page_data['page'],
+                    'text': context,
+                    'metadata': self.library[filename]['metadata']
+                })
+                
+                if len(results) >= max_results:
+                    return results
+        
+        return results
+    
+    def _ensure_search_index(self):
+        """Rebuild the word -> pages index if the library changed since it was built."""
+        if not self._index_dirty:
+            return
+        
+        self._inverted = {}
+        self._indexed_pages = []
         for filename, pdf_data in self.library.items():
             for page_data in pdf_data['pages']:
-                if query_lower in page_data['text'].lower():
-                    # Find the context around the match
-                    context = self._extract_context(page_data['text'], query, 200)
-                    
-                    results.append({
-                        'filename': filename,
-                        'page': page_data['page'],
-                        'text': context,
-                        'metadata': pdf_data['metadata']
-                    })
-                    
-                    if len(results) >= max_results:
-                        return results
+                page_id = len(self._indexed_pages)
+                self._indexed_pages.append((filename, page_data))
+                for token in set(_TOKEN_RE.findall(page_data['text_lower'])):
+                    self._inverted.setdefault(token, set()).add(page_id)
         
-        return results
+        self._index_dirty = False
+    
+    def _query_words(self, query_lower: str) -> Set[str]:
+        """
+        Get the indexable words a matching page must contain.
+        
+        Only words bounded on both sides within the query count: the first and last
+        words of a substring query may be parts of longer words in the page.
+        
+        Args:
+            query_lower: Lowercased search query
+            
+        Returns:
+            Set of whole words from the query
+        """
+        return {
+            match.group()
+            for match in _TOKEN_RE.finditer(query_lower)
+            if match.start() > 0 and match.end() < len(query_lower)
+        }
     
-    def _extract_metadata(self, pdf_reader) -> Dict:
+    def _extract_metadata(self, pdf_properties: Dict[str, str], page_texts: List[str]) -> Dict:
         """
         Extract comprehensive metadata from PDF properties and text content.
         
         Args:
-            pdf_reader: PyPDF2 PdfReader object
+            pdf_properties: Document properties from _read_pdf
+            page_texts: Text of every page in order
             
         Returns:
             Enhanced metadata dictionary
@@ -186,127 +907,51 @@ class PDFLibrary:
         
         try:
             # Extract basic PDF metadata
-            if pdf_reader.metadata:
-                raw_title = pdf_reader.metadata.get('/Title', '').strip()
-                raw_author = pdf_reader.metadata.get('/Author', '').strip()
-                raw_subject = pdf_reader.metadata.get('/Subject', '').strip()
+            if pdf_properties:
+                raw_title = pdf_properties.get('title', '').strip()
+                raw_author = pdf_properties.get('author', '').strip()
+                raw_subject = pdf_properties.get('subject', '').strip()
                 
                 # Clean and process title
-                metadata['title'] = self._clean_title(raw_title)
+                metadata['title'] = _clean_title(raw_title)
                 
                 # Parse and clean authors
                 if raw_author:
-                    metadata['authors'] = self._parse_authors(raw_author)
+                    metadata['authors'] = list(_parse_authors(raw_author))
                     metadata['author'] = raw_author  # Keep original for compatibility
                 
                 # Extract subject/keywords
                 metadata['subject'] = raw_subject
                 if raw_subject:
-                    metadata['keywords'] = self._extract_keywords(raw_subject)
+                    metadata['keywords'] = list(_extract_keywords(raw_subject))
                 
                 # Other metadata
-                metadata['creator'] = pdf_reader.metadata.get('/Creator', '').strip()
-                metadata['producer'] = pdf_reader.metadata.get('/Producer', '').strip()
-                metadata['creation_date'] = str(pdf_reader.metadata.get('/CreationDate', ''))
-                metadata['modification_date'] = str(pdf_reader.metadata.get('/ModDate', ''))
+                metadata['creator'] = pdf_properties.get('creator', '').strip()
+                metadata['producer'] = pdf_properties.get('producer', '').strip()
+                metadata['creation_date'] = pdf_properties.get('creationDate', '')
+                metadata['modification_date'] = pdf_properties.get('modDate', '')
                 
                 # Extract year from creation date if available
                 if not metadata['year']:
-                    metadata['year'] = self._extract_year_from_date(metadata['creation_date'])
+                    metadata['year'] = _extract_year_from_date(metadata['creation_date'])
             
-            metadata['num_pages'] = len(pdf_reader.pages)
+            metadata['num_pages'] = len(page_texts)
             
             # Extract text-based metadata from first few pages
-            text_metadata = self._extract_text_based_metadata(pdf_reader)
+            text_metadata = self._extract_text_based_metadata(page_texts)
             
             # Merge text-based metadata with PDF metadata (text-based takes precedence if more complete)
             metadata = self._merge_metadata(metadata, text_metadata)
             
             # Determine if this looks like an academic paper
-            metadata['is_academic_paper'], metadata['confidence_score'] = self._assess_academic_paper(metadata, pdf_reader)
+            metadata['is_academic_paper'], metadata['confidence_score'] = self._assess_academic_paper(metadata, page_texts)
             
         except Exception as e:
             print(f"Error extracting metadata: {str(e)}")
         
         return metadata
     
-    def _clean_title(self, title: str) -> str:
-        """Clean and normalize a title string."""
-        if not title:
-            return ''
-        
-        # Remove common prefixes and suffixes
-        title = title.strip()
-        title = re.sub(r'^(Microsoft Word - |Adobe PDF - )', '', title, flags=re.IGNORECASE)
-        title = re.sub(r'\.(pdf|doc|docx)$', '', title, flags=re.IGNORECASE)
-        
-        # Remove excessive whitespace
-        title = re.sub(r'\s+', ' ', title).strip()
-        
-        return title
-    
-    def _parse_authors(self, author_string: str) -> List[str]:
-        """Parse author string into list of individual authors."""
-        if not author_string:
-            return []
-        
-        authors = []
-        
-        # Split by common delimiters
-        for delimiter in [';', ',', ' and ', ' & ', '\n']:
-            if delimiter in author_string:
-                parts = author_string.split(delimiter)
-                authors = [part.strip() for part in parts if part.strip()]
-                break
-        
-        if not authors:
-            authors = [author_string.strip()]
-        
-        # Clean up individual author names
-        cleaned_authors = []
-        for author in authors:
-            # Remove email addresses and affiliations in parentheses
-            author = re.sub(r'\([^)]*\)', '', author)
-            author = re.sub(r'<[^>]*>', '', author)
-            author = author.strip()
-            if author and len(author) > 2:
-                cleaned_authors.append(author)
-        
-        return cleaned_authors
-    
-    def _extract_keywords(self, subject: str) -> List[str]:
-        """Extract keywords from subject field."""
-        if not subject:
-            return []
-        
-        # Split by common delimiters
-        keywords = []
-        for delimiter in [';', ',', '|', '\n']:
-            if delimiter in subject:
-                keywords = [kw.strip() for kw in subject.split(delimiter) if kw.strip()]
-                break
-        
-        if not keywords:
-            keywords = [subject.strip()]
-        
-        return [kw for kw in keywords if len(kw) > 2]
-    
-    def _extract_year_from_date(self, date_string: str) -> str:
-        """Extract year from date string."""
-        if not date_string:
-            return ''
-        
-        # Try to find 4-digit year
-        year_match = re.search(r'(\d{4})', date_string)
-        if year_match:
-            year = int(year_match.group(1))
-            # Only return reasonable years for academic papers
-            if 1900 <= year <= 2030:
-                return str(year)
-        
-        return ''
-    
-    def _extract_text_based_metadata(self, pdf_reader) -> Dict:
+    def _extract_text_based_metadata(self, page_texts: List[str]) -> Dict:
         """Extract metadata from PDF text content (first few pages)."""
         metadata = {
             'title': '',
@@ -323,246 +968,45 @@ class PDFLibrary:
         }
         
         try:
-            # Extract text from first 3 pages for metadata
-            first_pages_text = ""
-            max_pages = min(3, len(pdf_reader.pages))
-            
-            for i in range(max_pages):
-                try:
-                    page_text = pdf_reader.pages[i].extract_text()
-                    if page_text:
-                        first_pages_text += page_text + "\n"
-                except Exception:
-                    continue
+            # Use text from first 3 pages for metadata
+            first_pages_text = "".join(page_text + "\n" for page_text in page_texts[:3] if page_text)
             
             if not first_pages_text:
                 return metadata
             
+            # Skip the regex-heavy extraction for documents that do not look like papers
+            if not _ACADEMIC_HINT_RE.search(first_pages_text, 0, ACADEMIC_HINT_WINDOW):
+                return metadata
+            
             # Extract DOI
-            metadata['doi'] = self._extract_doi_from_text(first_pages_text)
+            metadata['doi'] = _extract_doi_from_text(first_pages_text)
             
             # Extract title from text
-            text_title = self._extract_title_from_text(first_pages_text)
+            text_title = _extract_title_from_text(first_pages_text)
             if text_title:
                 metadata['title'] = text_title
             
             # Extract authors from text
-            text_authors = self._extract_authors_from_text(first_pages_text)
+            text_authors = _extract_authors_from_text(first_pages_text)
             if text_authors:
                 metadata['authors'] = text_authors
             
             # Extract journal information
-            journal_info = self._extract_journal_info(first_pages_text)
+            journal_info = _extract_journal_info(first_pages_text)
             metadata.update(journal_info)
             
             # Extract year from text
             if not metadata['year']:
-                metadata['year'] = self._extract_year_from_text(first_pages_text)
+                metadata['year'] = _extract_year_from_text(first_pages_text)
             
             # Extract abstract
-            metadata['abstract'] = self._extract_abstract(first_pages_text)
+            metadata['abstract'] = _extract_abstract(first_pages_text)
             
         except Exception as e:
             print(f"Error in text-based metadata extraction: {str(e)}")
         
         return metadata
     
-    def _extract_doi_from_text(self, text: str) -> str:
-        """Extract DOI from text using comprehensive regex patterns."""
-        if not text:
-            return ''
-        
-        # Common DOI patterns
-        doi_patterns = [
-            r'doi:\s*([10]\.\d+\/[^\s]+)',
-            r'DOI:\s*([10]\.\d+\/[^\s]+)',
-            r'https?://doi\.org/([10]\.\d+\/[^\s]+)',
-            r'https?://dx\.doi\.org/([10]\.\d+\/[^\s]+)',
-            r'doi\.org/([10]\.\d+\/[^\s]+)',
-            r'(10\.\d+\/[^\s,;]+)',  # Generic DOI pattern
-        ]
-        
-        for pattern in doi_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                doi = match.group(1)
-                # Clean up DOI
-                doi = re.sub(r'[.,;)]$', '', doi)  # Remove trailing punctuation
-                if len(doi) > 7:  # Minimum reasonable DOI length
-                    return doi
-        
-        return ''
-    
-    def _extract_title_from_text(self, text: str) -> str:
-        """Extract title from PDF text content."""
-        if not text:
-            return ''
-        
-        lines = text.split('\n')
-        lines = [line.strip() for line in lines if line.strip()]
-        
-        if not lines:
-            return ''
-        
-        # Look for title in first few lines
-        for i, line in enumerate(lines[:10]):
-            # Skip very short lines or lines with lots of special characters
-            if len(line) < 10 or len(re.findall(r'[^\w\s]', line)) / len(line) > 0.3:
-                continue
-            
-            # Skip lines that look like headers, footers, or metadata
-            if any(keyword in line.lower() for keyword in ['page', 'volume', 'journal', 'doi', 'abstract', 'keywords', 'introduction']):
-                continue
-            
-            # Title is likely to be one of the longer lines at the beginning
-            if len(line) > 20 and len(line) < 200:
-                # Check if next lines might be continuation
-                full_title = line
-                for j in range(i + 1, min(i + 3, len(lines))):
-                    next_line = lines[j]
-                    if len(next_line) > 10 and len(next_line) < 100 and not any(keyword in next_line.lower() for keyword in ['author', 'university', 'department', 'email']):
-                        full_title += " " + next_line
-                    else:
-                        break
-                
-                return full_title.strip()
-        
-        return ''
-    
-    def _extract_authors_from_text(self, text: str) -> List[str]:
-        """Extract authors from PDF text content."""
-        if not text:
-            return []
-        
-        lines = text.split('\n')
-        lines = [line.strip() for line in lines if line.strip()]
-        
-        authors = []
-        
-        # Look for author patterns in first 20 lines
-        for i, line in enumerate(lines[:20]):
-            # Skip very short lines
-            if len(line) < 3:
-                continue
-            
-            # Look for lines that might contain author names
-            # Authors often appear after title and before abstract/keywords
-            if any(keyword in line.lower() for keyword in ['author', 'by ']):
-                # Extract names after "author" or "by"
-                author_text = re.sub(r'^.*?(author|by)\s*:?\s*', '', line, flags=re.IGNORECASE)
-                if author_text:
-                    authors.extend(self._parse_authors(author_text))
-            
-            # Look for lines with name patterns (First Last, First Last)
-            name_pattern = r'([A-Z][a-z]+ [A-Z][a-z]+(?:,\s*[A-Z][a-z]+ [A-Z][a-z]+)*)'
-            matches = re.findall(name_pattern, line)
-            for match in matches:
-                if len(match) > 5 and len(match) < 100:  # Reasonable author name length
-                    authors.extend(self._parse_authors(match))
-        
-        # Remove duplicates and clean
-        unique_authors = []
-        for author in authors:
-            if author not in unique_authors and len(author) > 2:
-                unique_authors.append(author)
-        
-        return unique_authors[:10]  # Limit to reasonable number
-    
-    def _extract_journal_info(self, text: str) -> Dict:
-        """Extract journal, volume, issue, and page information."""
-        info = {'journal': '', 'volume': '', 'issue': '', 'pages': '', 'publisher': ''}
-        
-        if not text:
-            return info
-        
-        lines = text.split('\n')
-        
-        # Look for journal patterns in first 30 lines
-        for line in lines[:30]:
-            line = line.strip()
-            if len(line) < 5:
-                continue
-            
-            # Journal name patterns
-            journal_indicators = ['journal', 'proceedings', 'conference', 'international', 'ieee', 'acm', 'springer', 'elsevier']
-            if any(indicator in line.lower() for indicator in journal_indicators):
-                # Extract journal name
-                if not info['journal'] and len(line) < 150:
-                    # Clean up potential journal name
-                    journal = re.sub(r'(volume|vol|issue|no|pp?\.)\s*\d+.*$', '', line, flags=re.IGNORECASE)
-                    journal = re.sub(r'\d{4}.*$', '', journal)  # Remove year and everything after
-                    journal = journal.strip()
-                    if len(journal) > 5:
-                        info['journal'] = journal
-            
-            # Volume and issue patterns
-            vol_pattern = r'vol(?:ume)?\s*\.?\s*(\d+)'
-            vol_match = re.search(vol_pattern, line, re.IGNORECASE)
-            if vol_match and not info['volume']:
-                info['volume'] = vol_match.group(1)
-            
-            issue_pattern = r'(?:issue|no|number)\s*\.?\s*(\d+)'
-            issue_match = re.search(issue_pattern, line, re.IGNORECASE)
-            if issue_match and not info['issue']:
-                info['issue'] = issue_match.group(1)
-            
-            # Page patterns
-            page_pattern = r'pp?\.\s*(\d+(?:-\d+)?)'
-            page_match = re.search(page_pattern, line, re.IGNORECASE)
-            if page_match and not info['pages']:
-                info['pages'] = page_match.group(1)
-            
-            # Publisher patterns
-            publishers = ['springer', 'elsevier', 'ieee', 'acm', 'wiley', 'taylor', 'francis', 'sage', 'oxford', 'cambridge']
-            for publisher in publishers:
-                if publisher in line.lower() and not info['publisher']:
-                    info['publisher'] = publisher.title()
-                    break
-        
-        return info
-    
-    def _extract_year_from_text(self, text: str) -> str:
-        """Extract publication year from text content."""
-        if not text:
-            return ''
-        
-        # Look for year patterns in first 50 lines
-        lines = text.split('\n')[:50]
-        
-        for line in lines:
-            # Look for 4-digit years, prioritizing those near publication keywords
-            year_matches = re.findall(r'(\d{4})', line)
-            for year_str in year_matches:
-                year = int(year_str)
-                if 1900 <= year <= 2030:
-                    # Check if year appears near publication-related keywords
-                    context = line.lower()
-                    if any(keyword in context for keyword in ['published', 'copyright', '©', 'journal', 'conference', 'proceedings']):
-                        return year_str
-                    # Or if it's just a reasonable recent year
-                    if 1980 <= year <= 2030:
-                        return year_str
-        
-        return ''
-    
-    def _extract_abstract(self, text: str) -> str:
-        """Extract abstract from PDF text."""
-        if not text:
-            return ''
-        
-        # Look for abstract section
-        abstract_pattern = r'abstract\s*[:\-]?\s*(.*?)(?=\n\s*(?:keywords|introduction|1\.|\d+\.|references))'
-        match = re.search(abstract_pattern, text, re.IGNORECASE | re.DOTALL)
-        
-        if match:
-            abstract = match.group(1).strip()
-            # Clean up the abstract
-            abstract = re.sub(r'\s+', ' ', abstract)
-            if 50 < len(abstract) < 2000:  # Reasonable abstract length
-                return abstract
-        
-        return ''
-    
     def _merge_metadata(self, pdf_metadata: Dict, text_metadata: Dict) -> Dict:
         """Merge PDF metadata with text-based metadata."""
         merged = pdf_metadata.copy()
@@ -584,7 +1028,7 @@ class PDFLibrary:
         
         return merged
     
-    def _assess_academic_paper(self, metadata: Dict, pdf_reader) -> tuple:
+    def _assess_academic_paper(self, metadata: Dict, page_texts: List[str]) -> tuple:
         """Assess whether this PDF is likely an academic paper and return confidence score."""
         score = 0.0
         max_score = 10.0
@@ -610,16 +1054,14 @@ class PDFLibrary:
         # Check text content indicators
         try:
             first_page_text = ""
-            if len(pdf_reader.pages) > 0:
-                first_page_text = pdf_reader.pages[0].extract_text().lower()
+            if len(page_texts) > 0:
+                first_page_text = page_texts[0].lower()
             
-            academic_keywords = ['abstract', 'introduction', 'methodology', 'references', 'conclusion', 'keywords', 'doi']
-            for keyword in academic_keywords:
-                if keyword in first_page_text:
-                    score += 0.3
+            academic_keywords = set(_ACADEMIC_KEYWORD_RE.findall(first_page_text))
+            score += 0.3 * len(academic_keywords)
             
             # Check for common academic structures
-            if 'references' in first_page_text or len(pdf_reader.pages) > 5:
+            if 'references' in academic_keywords or len(page_texts) > 5:
                 score += 0.5
                 
         except Exception:
@@ -630,73 +1072,6 @@ class PDFLibrary:
         
         return is_academic, confidence
     
-    def _split_into_chunks(self, text: str, chunk_size: int = 500) -> List[str]:
-        """
-        Split text into smaller chunks for better processing.
-        
-        Args:
-            text: Text to split
-            chunk_size: Approximate size of each chunk
-            
-        Returns:
-            List of text chunks
-        """
-        # Split by sentences first
-        sentences = re.split(r'[.!?]+', text)
-        
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-                
-            # If adding this sentence would exceed chunk size, start new chunk
-            if len(current_chunk) + len(sentence) > chunk_size and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = sentence
-            else:
-                current_chunk += " " + sentence if current_chunk else sentence
-        
-        # Add the last chunk
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        return chunks
-    
-    def _extract_context(self, text: str, query: str, context_length: int = 200) -> str:
-        """
-        Extract context around a query match.
-        
-        Args:
-            text: Text to search in
-            query: Query to find
-            context_length: Number of characters of context on each side
-            
-        Returns:
-            Context string
-        """
-        text_lower = text.lower()
-        query_lower = query.lower()
-        
-        match_pos = text_lower.find(query_lower)
-        if match_pos == -1:
-            return text[:context_length * 2]  # Return beginning if no match
-        
-        start = max(0, match_pos - context_length)
-        end = min(len(text), match_pos + len(query) + context_length)
-        
-        context = text[start:end]
-        
-        # Add ellipsis if we're not at the beginning/end
-        if start > 0:
-            context = "..." + context
-        if end < len(text):
-            context = context + "..."
-        
-        return context
-    
     def get_library_stats(self) -> Dict:
         """
         Get statistics about the library.
@@ -705,8 +1080,8 @@ class PDFLibrary:
             Statistics dictionary
         """
         total_files = len(self.library)
-        total_pages = sum(len(pdf_data['pages']) for pdf_data in self.library.values())
-        total_chars = sum(len(pdf_data['full_text']) for pdf_data in self.library.values())
+        total_pages = self._total_pages
+        total_chars = self._total_chars
         
         return {
             'total_files': total_files,